@@ -0,0 +1,106 @@
+"""Benchmark extract_data on the schedule dump and check it against the original extraction.
+
+The dump is also concatenated --scale times into a larger synthetic filing,
+to show throughput holding up and peak memory staying flat as input grows:
+
+    python bench_extract.py
+    python bench_extract.py --scale 50 --repeat 3
+
+Output/extracted_data.csv (924 records) is the reference. Rows that the
+original extraction took from page footers ("Case 25-81226-TLS Doc ...")
+are expected to be gone. Exits with status 1 when any other reference row
+is missing from the new output.
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import extract_data
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run(input_path, output_path, repeat):
+    """Best wall time of `repeat` extractions, and the record count."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = extract_data.extract(input_path, output_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+def peak_memory(input_path):
+    """Peak Python heap while extracting input_path (output discarded)."""
+    tracemalloc.start()
+    with open(input_path, encoding='utf-8', newline='') as fh:
+        writer = csv.writer(io.StringIO())
+        for record in extract_data.iter_creditors(fh):
+            writer.writerow(record)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def compare(reference_path, output_path):
+    """(rows matched, reference rows missing, new rows) as multisets of rows."""
+    def rows(path):
+        with open(path, encoding='utf-8', newline='') as fh:
+            found = {}
+            for row in list(csv.reader(fh))[1:]:
+                found[tuple(row)] = found.get(tuple(row), 0) + 1
+            return found
+
+    reference, output = rows(reference_path), rows(output_path)
+    matched = sum(min(n, output.get(row, 0)) for row, n in reference.items())
+    missing = [row for row, n in reference.items() for _ in range(n - output.get(row, 0))]
+    extra = [row for row, n in output.items() for _ in range(n - reference.get(row, 0))]
+    return matched, missing, extra
+
+if __name__ == "__main__":
+    import logging
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark the creditor extraction.")
+    arg_parser.add_argument('--input', default=os.path.join(HERE, "..", "Input", "data.txt"))
+    arg_parser.add_argument('--reference', default=os.path.join(HERE, "..", "Output", "extracted_data.csv"))
+    arg_parser.add_argument('--scale', type=int, default=20, help="Copies of the dump in the large filing")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per input; the best time is reported")
+    args = arg_parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    work_dir = tempfile.mkdtemp(prefix='bench_extract_')
+    try:
+        large_path = os.path.join(work_dir, 'data_large.txt')
+        with open(large_path, 'wb') as out:
+            for _ in range(args.scale):
+                with open(args.input, 'rb') as fh:
+                    shutil.copyfileobj(fh, out)
+
+        output_path = os.path.join(work_dir, 'extracted.csv')
+        print(f"{'input':<28}{'MB':>8}{'records':>10}{'seconds':>10}{'MB/s':>8}{'records/s':>12}{'peak KB':>10}")
+        for label, path in (('data.txt', args.input), (f'data.txt x{args.scale}', large_path)):
+            size_mb = os.path.getsize(path) / 1e6
+            elapsed, count = run(path, output_path, args.repeat)
+            peak_kb = peak_memory(path) / 1024
+            print(f"{label:<28}{size_mb:>8.2f}{count:>10}{elapsed:>10.3f}{size_mb / elapsed:>8.1f}"
+                  f"{count / elapsed:>12.0f}{peak_kb:>10.0f}")
+
+        extract_data.extract(args.input, output_path)
+        matched, missing, extra = compare(args.reference, output_path)
+        # The original extraction took a few page footers for creditors
+        footers = [row for row in missing if extract_data.SKIP_RE.match(row[0])]
+        missing = [row for row in missing if not extract_data.SKIP_RE.match(row[0])]
+        print(f"\nReference: {matched} rows identical, {len(footers)} page-footer rows dropped, "
+              f"{len(missing)} missing, {len(extra)} new")
+        for row in missing:
+            print(f"  missing: {row}")
+        for row in extra:
+            print(f"  new:     {row}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,162 @@
+"""Extract the creditors of Official Form 206 E/F schedules into a flat CSV.
+
+Input/data.txt is the tab-separated dump of the filing: one row per table
+line, cells quoted when they run over several lines. A creditor shows up as
+
+    3.1   Nonpriority creditor's name and mailing address ... $636.06
+          3F Trucking LLC PO Box 767
+          Perryton, TX 79070
+          Date(s) debt was incurred ...
+
+i.e. a heading row carrying the claim amount ("Unknown" when none is
+given), the record id, then the cell with the name and mailing address.
+Page footers, record ids, check boxes and the "Date or dates" / "Last 4
+digits" rows can sit in between and are skipped.
+
+The dump is read once with csv.reader, which takes the file a line at a
+time and joins quoted cells that span lines, and rows are classified and
+fed through a small state machine, so each creditor is written out as soon
+as its address cell is seen and memory stays flat however long the
+filing is:
+
+    python extract_data.py ../Input/data.txt ../Output/extracted_data.csv
+"""
+import csv
+import logging
+import os
+import re
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Input/ and Output/ live here; upwork.py sets this from its config
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+COLUMNS = ['Name', 'Address 1', 'Address 2', 'City', 'State', 'Zip', 'Amount']
+
+HEADING_RE = re.compile(r"\b(Priority|Nonpriority) creditor's name and mailing address")
+# Claim amount at the end of a heading; a priority heading ends in total claim then priority amount
+AMOUNT_RE = re.compile(r"(Unknown|\$[\d,]+\.\d\d)\s*$")
+# Rows between a heading and its creditor that aren't the creditor; long
+# record ids wrap inside their cell ("3.100\n0")
+SKIP_RE = re.compile(
+    r"^(?:\d+\.[\d\n]+$|Case \d|Official Form|Date or dates|Last 4 digits|Check all that apply|Total|□)")
+# The address cell stops before the claim's own fields
+ADDRESS_END = 'Date(s) debt'
+CITY_STATE_ZIP_RE = re.compile(r"^(.*), ([A-Z]{2}) (\d{5}(?:-\d{4})?)$")
+# Where the street part starts on a line that also holds the name: "411 N 84th...", "PO Box ..."
+STREET_RE = re.compile(r"\s(?=\d+\s+[A-Za-z]|PO Box)")
+UNKNOWN_NAME = 'UNKNOWN'
+
+# Row kinds
+BLANK, HEADING, SKIP, CELL = 'blank', 'heading', 'skip', 'cell'
+# States
+SEEK, CLAIM = 'seek', 'claim'
+# (state, row kind) -> (next state, action); pairs not listed leave the state alone
+TRANSITIONS = {
+    (SEEK, HEADING): (CLAIM, 'open'),
+    # A heading whose creditor never showed up is replaced by the next one
+    (CLAIM, HEADING): (CLAIM, 'open'),
+    (CLAIM, CELL): (SEEK, 'emit'),
+}
+
+def classify(row):
+    """(kind, cell) of one dump row."""
+    cells = [c.strip() for c in row if c.strip()]
+    if not cells:
+        return BLANK, None
+    for cell in cells:
+        if HEADING_RE.search(cell):
+            return HEADING, cell
+    if SKIP_RE.match(cells[0]):
+        return SKIP, cells[0]
+    return CELL, cells[0]
+
+def parse_amount(heading):
+    m = AMOUNT_RE.search(heading)
+    if not m or m.group(1) == 'Unknown':
+        return '0.00'
+    return m.group(1).lstrip('$')
+
+def split_name(line):
+    """Split "Name 123 Street" into (name, street); street is '' when the line has none."""
+    m = STREET_RE.search(line, 1)
+    if not m:
+        return line, ''
+    return line[:m.start()].strip(), line[m.end():].strip()
+
+def creditor_fields(lines):
+    """Name, Address 1 and Address 2 from the lines above the city line."""
+    name, street = split_name(lines[0])
+    if street:
+        return name, street, ' '.join(lines[1:])
+    return name, ' '.join(lines[1:]), ''
+
+def parse_creditor(cell, amount):
+    """One output row from a name-and-address cell.
+
+    The last line is "City, ST 12345"; when name and street share it, the
+    whole prefix is kept as City and Name is UNKNOWN. Foreign addresses
+    have no such line and keep everything after the name in Address 1.
+    """
+    lines = []
+    for line in cell.split('\n'):
+        line = line.strip()
+        if line.startswith(ADDRESS_END):
+            break
+        if line:
+            lines.append(line)
+    if not lines:
+        return None
+
+    m = CITY_STATE_ZIP_RE.match(lines[-1])
+    if not m:
+        return [*creditor_fields(lines), '', '', '', amount]
+    city, state, zip_code = m.groups()
+    if len(lines) == 1:
+        return [UNKNOWN_NAME, '', '', city, state, zip_code, amount]
+    return [*creditor_fields(lines[:-1]), city, state, zip_code, amount]
+
+def iter_creditors(fh):
+    """Yield output rows from an open dump, one per creditor, in filing order."""
+    state = SEEK
+    amount = None
+    for row in csv.reader(fh, delimiter='\t'):
+        kind, cell = classify(row)
+        state, action = TRANSITIONS.get((state, kind), (state, None))
+        if action == 'open':
+            amount = parse_amount(cell)
+        elif action == 'emit':
+            record = parse_creditor(cell, amount)
+            if record is None:
+                # Nothing usable in the cell; keep waiting for this claim's creditor
+                state = CLAIM
+                continue
+            yield record
+
+def extract(input_path, output_path):
+    """Stream the creditors of input_path into the CSV at output_path; returns the record count."""
+    logging.info(f"Extracting creditors from {input_path}...")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    count = 0
+    with open(input_path, encoding='utf-8', newline='') as fh, \
+            open(output_path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        for record in iter_creditors(fh):
+            writer.writerow(record)
+            count += 1
+    logging.info(f"Saved {count} records to {output_path}")
+    return count
+
+def main(argv=None):
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Extract creditors from a Form 206 E/F schedule dump.")
+    arg_parser.add_argument('input', nargs='?', default=os.path.join(PROJECT_DIR, "Input", "data.txt"))
+    arg_parser.add_argument('output', nargs='?', default=os.path.join(PROJECT_DIR, "Output", "extracted_data.csv"))
+    args = arg_parser.parse_args(argv)
+
+    extract(args.input, args.output)
+
+if __name__ == "__main__":
+    main()
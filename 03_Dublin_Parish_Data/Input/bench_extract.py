@@ -0,0 +1,221 @@
+"""Benchmark parse_details on saved parish pages and check it against the original extraction.
+
+Pages come from --fixtures (any folder of .html files, e.g. ../Processing/http_cache)
+or, by default, are generated from Output/dublin_parishes.csv as WordPress-style
+parish pages with the same fields, navigation, scripts and mass-time tables:
+
+    python bench_extract.py
+    python bench_extract.py --fixtures ../Processing/http_cache --repeat 3
+
+Exits with status 1 when any backend returns a field that differs from the
+original implementation.
+"""
+import argparse
+import csv
+import glob
+import html
+import os
+import re
+import sys
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+import script
+from parish_extract import BACKENDS
+
+def reference_details(url, content):
+    """The original html.parser extraction, kept verbatim as the equivalence baseline."""
+    data = {"Parish Name": "", "Church Names": "", "Priests": "", "Secretary": "", "Phone": "", "Email": "",
+            "Address": "", "Parish URL": url}
+    soup = BeautifulSoup(content, 'html.parser')
+
+    title = soup.find('h1')
+    if title:
+        data["Parish Name"] = script.clean_text(title.get_text())
+
+    content = soup.find('div', class_='entry-content') or soup.find('div', id='content')
+    if not content:
+        return data
+
+    full_text = content.get_text(separator="\n")
+
+    churches = []
+    generic_headers = ["Contact", "Mass Times", "Confession", "Sacraments", "Details", "Introduction", "Team", "Church Information", "Church Address", "Accessibility"]
+
+    for header in content.find_all(['h2', 'h3', 'h4']):
+        text = script.clean_text(header.get_text())
+        if not text:
+            continue
+
+        is_generic = any(g.lower() == text.lower().replace(":", "").strip() for g in generic_headers)
+        if is_generic:
+            continue
+
+        if len(text) > 3 and "parish" not in text.lower():
+            start_keywords = ["Church", "St", "Saint", "Our Lady", "Holy", "Mary", "Blessed", "Sacred Heart", "Nativity", "Immaculate"]
+            if any(k in text for k in start_keywords):
+                churches.append(text)
+
+    if not churches:
+        if "St" in data["Parish Name"] or "Church" in data["Parish Name"]:
+            churches.append(data["Parish Name"])
+
+    data["Church Names"] = " | ".join(sorted(list(set(churches)), key=len, reverse=True))
+
+    emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', full_text))
+    data["Email"] = " | ".join(sorted(list(emails)))
+
+    phones = set(re.findall(r'(?:\(?0\d{1,3}\)?[\s\-\.]?)?\d{3}[\s\-\.]?\d{4}', full_text))
+    valid_phones = []
+    for p in phones:
+        digits = "".join(c for c in p if c.isdigit())
+        if len(digits) >= 7 and not (len(digits)==4 and p.startswith("20")):
+            valid_phones.append(p.strip())
+
+    data["Phone"] = " | ".join(sorted(list(set(valid_phones))))
+
+    priests = []
+    secretary = []
+    lines = full_text.split('\n')
+
+    titles_to_skip = ["parish priest", "curate", "curates", "team", "moderator", "administrator", "parish chaplain", "co-parish priest", "chaplain", "priests of the parish", "priest in charge"]
+
+    for line in lines:
+        line_clean = script.clean_text(line)
+        lower_line = line_clean.lower()
+        if not line_clean:
+            continue
+
+        if any(marker in lower_line for marker in ["moderator", "co-pp", "curate", "adm", "chaplain", "parish priest", "very rev", "rev."]):
+            clean_lower = lower_line.replace(":", "").strip()
+            if clean_lower in titles_to_skip:
+                continue
+            if len(line_clean) < 80 and not any(c.isdigit() for c in line_clean):
+                priests.append(line_clean)
+
+        if "secretary" in lower_line:
+            if ":" in line_clean or len(line_clean) < 50:
+                if lower_line.replace(":", "").strip() != "parish secretary":
+                    secretary.append(line_clean)
+
+    data["Priests"] = " | ".join(sorted(list(set(priests))))
+    data["Secretary"] = " | ".join(sorted(list(set(secretary))))
+
+    address_parts = []
+    seen_address = set()
+    for line in lines:
+        line_clean = script.clean_text(line)
+        if not line_clean:
+            continue
+        if re.search(r'Dublin\s?\d+|Co\.?\s?(?:Dublin|Wicklow|Kildare)', line, re.IGNORECASE):
+            if line_clean not in seen_address:
+                address_parts.append(line_clean)
+                seen_address.add(line_clean)
+
+    data["Address"] = " | ".join(address_parts)
+    return data
+
+def _split(value):
+    return [v for v in value.split(" | ") if v] if value else []
+
+def fixture_page(row, i):
+    """A WordPress-style parish page carrying the fields of one CSV row."""
+    e = html.escape
+    nav = "".join(f'<li class="menu-item"><a href="/section-{k}/">Section {k}</a></li>' for k in range(60))
+    masses = "".join(f"<tr><td>{day}</td><td>{h}:00</td><td>&nbsp;</td></tr>"
+                     for day in ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun") for h in (8, 10, 12, 19))
+    churches = "".join(f"<h2>{e(c)}</h2><table class=\"mass-times\">{masses}</table>"
+                       for c in _split(row["Church Names"]))
+    priests = "".join(f"<p><strong>{'Moderator' if k == 0 else 'Curate'}:</strong><br>\n{e(p)}</p>"
+                      for k, p in enumerate(_split(row["Priests"])))
+    secretary = "".join(f"<p>{e(s)}</p>" for s in _split(row["Secretary"]))
+    phones = "".join(f"<li>Tel:&nbsp;{e(p)}</li>" for p in _split(row["Phone"]))
+    emails = "".join(f'<li><a href="mailto:{e(m)}">{e(m)}</a></li>' for m in _split(row["Email"]))
+    address = "<br>\n".join(e(a) for a in _split(row["Address"]))
+    return f"""<!DOCTYPE html>
+<html lang="en-IE"><head><meta charset="UTF-8"><title>{e(row['Parish Name'])} - Archdiocese of Dublin</title>
+<style>.entry-content p {{ margin: 0 }}</style>
+<script>window.dataLayer = window.dataLayer || []; var parish = {i};</script></head>
+<body class="parish-template-default"><header><nav><ul class="menu">{nav}</ul></nav></header>
+<main id="main"><article class="parish type-parish">
+<h1 class="entry-title">{e(row['Parish Name'])}</h1>
+<div class="entry-content">
+<!-- wp:heading --><h3>Introduction</h3><p>Welcome to the parish of {e(row['Parish Name'])}.</p>
+{churches}
+<h3>Team</h3>{priests}{secretary}
+<h3>Contact</h3><ul>{phones}{emails}</ul>
+<h4>Church Address</h4><p>{address}</p>
+<script type="text/javascript">initMap({i});</script>
+</div></article></main>
+<footer><p>Archbishop's House, Drumcondra, Dublin 9</p></footer></body></html>
+"""
+
+def make_fixtures(csv_path, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(csv_path, newline='', encoding='utf-8-sig') as fh:
+        rows = list(csv.DictReader(fh, delimiter=':'))
+    for i, row in enumerate(rows):
+        with open(os.path.join(out_dir, f"parish_{i:03d}.html"), 'w', encoding='utf-8') as out:
+            out.write(fixture_page(row, i))
+    return len(rows)
+
+def load_pages(fixtures_dir):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, '*.html'))):
+        with open(path, 'rb') as fh:
+            pages.append((os.path.basename(path), fh.read()))
+    return pages
+
+def timed(fn, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(name, content) for name, content in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark parish page extraction backends.")
+    arg_parser.add_argument('--fixtures', help="Folder of saved .html pages (default: generate from the CSV)")
+    arg_parser.add_argument('--csv', default=script.OUTPUT_PATH,
+                            help="CSV the generated fixtures are built from")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per backend; the best is reported")
+    args = arg_parser.parse_args(argv)
+
+    # Keep parse warnings out of the extraction log
+    script.LOG_PATH = os.devnull
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures_dir = args.fixtures
+        if not fixtures_dir:
+            fixtures_dir = tmp
+            make_fixtures(args.csv, fixtures_dir)
+        pages = load_pages(fixtures_dir)
+
+    if not pages:
+        print(f"No .html pages in {fixtures_dir}")
+        return 1
+    size_mb = sum(len(c) for _, c in pages) / 1024 / 1024
+    print(f"{len(pages)} pages, {size_mb:.1f} MB")
+
+    base_time, expected = timed(reference_details, pages, args.repeat)
+    print(f"  {'original':<12} {base_time:8.3f}s  {len(pages) / base_time:8.0f} pages/s")
+
+    failed = False
+    for backend in BACKENDS:
+        elapsed, results = timed(lambda url, content: script.parse_details(url, content, backend),
+                                 pages, args.repeat)
+        mismatches = [(name, field) for (name, _), want, got in zip(pages, expected, results)
+                      for field in want if want[field] != got[field]]
+        print(f"  {backend:<12} {elapsed:8.3f}s  {len(pages) / elapsed:8.0f} pages/s  "
+              f"x{base_time / elapsed:.1f}  {len(mismatches)} field mismatches")
+        for name, field in mismatches[:10]:
+            print(f"    {name}: {field}")
+        failed = failed or bool(mismatches)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# requests is imported by the first request, so a crawl served from the
+# cache (or `--help`) doesn't load it
+
+# Worth another try: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket: on average `rate` requests per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class FetchEngine:
+    """Bounded thread-pool fetcher over pooled keep-alive connections.
+
+    Each worker thread keeps its own requests.Session, so connections are
+    reused across pages instead of opened per URL. Requests are paced by a
+    shared TokenBucket and failed requests (connection errors, 429, 5xx) are
+    retried with exponential backoff, honouring Retry-After when sent.
+    """
+
+    def __init__(self, concurrency=8, rate=5.0, burst=None, retries=3, backoff=0.5,
+                 timeout=30, headers=None):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst or concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt)
+
+    def get(self, url, **kwargs):
+        """GET url with pacing and retries; returns the Response (raises on final failure)."""
+        import requests
+
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                response = self._session().get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                response.close()
+                time.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+                continue
+            response.raise_for_status()
+            return response
+
+    def map_ordered(self, fn, items):
+        """Run fn(item) on the pool and yield results in input order as soon as possible.
+
+        Results that finish early wait in a small buffer until everything
+        before them is done, so the caller can stream them straight to disk.
+        At most 2 * concurrency items are in flight or buffered at a time.
+        """
+        items = list(items)
+        window = 2 * self.concurrency
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {}
+            submitted = 0
+            for i in range(len(items)):
+                while submitted < len(items) and submitted < i + window:
+                    futures[submitted] = pool.submit(fn, items[submitted])
+                    submitted += 1
+                yield futures.pop(i).result()
+
+    def close(self):
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+class HttpCache:
+    """On-disk response cache keyed by URL, revalidated with ETag/Last-Modified.
+
+    Every page is kept as <sha1>.html with a <sha1>.json sidecar holding the
+    URL and validators. fetch() sends If-None-Match/If-Modified-Since for
+    cached pages, so unchanged pages come back as an empty 304 and are served
+    from disk; offline=True never touches the network.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.stats = {'fresh': 0, 'not_modified': 0, 'offline': 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + '.html', base + '.json'
+
+    def load(self, url):
+        """Return (meta, content) for a cached URL, or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as fh:
+                meta = json.load(fh)
+            with open(body_path, 'rb') as fh:
+                return meta, fh.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url, response):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        # Body first, then the sidecar: a page only counts as cached once both exist
+        for path, data in ((body_path, response.content), (meta_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def fetch(self, url, get, offline=False):
+        """Return the page content, using get(url, headers=...) only when needed.
+
+        get is FetchEngine.get (or anything returning a requests Response).
+        Raises KeyError in offline mode when the page was never cached.
+        """
+        cached = self.load(url)
+        if offline:
+            if cached is None:
+                raise KeyError(f"{url} is not in the cache")
+            self._count('offline')
+            return cached[1]
+
+        headers = {}
+        if cached is not None:
+            meta = cached[0]
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self._count('not_modified')
+            return cached[1]
+
+        self.store(url, response)
+        self._count('fresh')
+        return response.content
+
+class CrawlCheckpoint:
+    """Finished rows of an interrupted crawl, so the next run can pick up where it stopped.
+
+    Rows are kept per URL in a JSON file that is rewritten atomically every
+    `every` rows (and on save()); clear() removes it once a crawl completes.
+    """
+
+    def __init__(self, path, base_url, every=10):
+        self.path = path
+        self.base_url = base_url
+        self.every = every
+        self.rows = {}
+        self._pending = 0
+        try:
+            with open(path, encoding='utf-8') as fh:
+                saved = json.load(fh)
+            # A checkpoint of a different directory page can't be resumed
+            if saved.get('base_url') == base_url:
+                self.rows = saved.get('rows', {})
+        except (OSError, ValueError):
+            pass
+
+    def __contains__(self, url):
+        return url in self.rows
+
+    def add(self, url, row):
+        self.rows[url] = row
+        self._pending += 1
+        if self._pending >= self.every:
+            self.save()
+
+    def save(self):
+        if not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'base_url': self.base_url, 'rows': self.rows}, fh)
+        os.replace(tmp_path, self.path)
+        self._pending = 0
+
+    def clear(self):
+        self.rows = {}
+        self._pending = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
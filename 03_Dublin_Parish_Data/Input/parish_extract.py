@@ -0,0 +1,146 @@
+import importlib.util
+import re
+
+# lxml is a C parser and is used directly (no BeautifulSoup tree) when installed.
+# bs4 and lxml themselves are only imported once a page is parsed.
+BACKENDS = ('lxml', 'html.parser') if importlib.util.find_spec('lxml') is not None else ('html.parser',)
+DEFAULT_BACKEND = BACKENDS[0]
+
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'(?:\(?0\d{1,3}\)?[\s\-\.]?)?\d{3}[\s\-\.]?\d{4}')
+ADDRESS_RE = re.compile(r'Dublin\s?\d+|Co\.?\s?(?:Dublin|Wicklow|Kildare)', re.IGNORECASE)
+DIGIT_RE = re.compile(r'\d')
+
+GENERIC_HEADERS = frozenset(g.lower() for g in [
+    "Contact", "Mass Times", "Confession", "Sacraments", "Details", "Introduction", "Team",
+    "Church Information", "Church Address", "Accessibility",
+])
+CHURCH_KEYWORDS = ("Church", "St", "Saint", "Our Lady", "Holy", "Mary", "Blessed", "Sacred Heart", "Nativity",
+                   "Immaculate")
+PRIEST_MARKERS = ("moderator", "co-pp", "curate", "adm", "chaplain", "parish priest", "very rev", "rev.")
+TITLES_TO_SKIP = frozenset(["parish priest", "curate", "curates", "team", "moderator", "administrator",
+                            "parish chaplain", "co-parish priest", "chaplain", "priests of the parish",
+                            "priest in charge"])
+
+# Text inside these is not page text (BeautifulSoup's get_text leaves it out too)
+_SKIP_TAGS = frozenset(['script', 'style', 'template'])
+_CONTENT_XPATH = ("//div[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]"
+                  " | //div[@id='content']")
+
+def clean_text(text):
+    if not text:
+        return ""
+    return " ".join(text.split()).strip()
+
+def _strings(el, out, top=True):
+    # Text nodes in document order, like BeautifulSoup's _all_strings
+    if isinstance(el.tag, str) and el.tag not in _SKIP_TAGS:
+        if el.text:
+            out.append(el.text)
+        for child in el:
+            _strings(child, out, False)
+    if not top and el.tail:
+        out.append(el.tail)
+    return out
+
+def _parts_lxml(content):
+    import lxml.html
+    from bs4 import UnicodeDammit
+
+    if isinstance(content, bytes):
+        # Same encoding detection as BeautifulSoup (declared charset, then UTF-8, ...)
+        content = UnicodeDammit(content, is_html=True).unicode_markup
+    doc = lxml.html.document_fromstring(content)
+
+    title = next(doc.iter('h1'), None)
+    title = "".join(_strings(title, [])) if title is not None else None
+
+    # Any entry-content div wins over #content, as in find(...) or find(...)
+    divs = doc.xpath(_CONTENT_XPATH)
+    div = next((d for d in divs if 'entry-content' in (d.get('class') or "").split()), None)
+    if div is None:
+        div = next((d for d in divs if d.get('id') == 'content'), None)
+    if div is None:
+        return title, None, None
+
+    headers = ["".join(_strings(h, [])) for h in div.iter('h2', 'h3', 'h4')]
+    return title, headers, "\n".join(_strings(div, []))
+
+def _parts_soup(content, backend):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, backend)
+    title = soup.find('h1')
+    title = title.get_text() if title else None
+    div = soup.find('div', class_='entry-content') or soup.find('div', id='content')
+    if not div:
+        return title, None, None
+    headers = [h.get_text() for h in div.find_all(['h2', 'h3', 'h4'])]
+    return title, headers, div.get_text(separator="\n")
+
+def page_parts(content, backend=DEFAULT_BACKEND):
+    """Return (h1 text, [h2/h3/h4 texts], content text joined by newlines) for a page.
+
+    The last two are None when the page has no entry-content/#content div.
+    """
+    if backend == 'lxml':
+        return _parts_lxml(content)
+    return _parts_soup(content, backend)
+
+def classify(data, headers, full_text):
+    """Fill the church/email/phone/priest/secretary/address fields of data from page text."""
+    # Church names from the section headers
+    churches = []
+    for header in headers:
+        text = clean_text(header)
+        if not text:
+            continue
+        lower = text.lower()
+        if lower.replace(":", "").strip() in GENERIC_HEADERS:
+            continue
+        if len(text) > 3 and "parish" not in lower and any(k in text for k in CHURCH_KEYWORDS):
+            churches.append(text)
+
+    if not churches:
+        if "St" in data["Parish Name"] or "Church" in data["Parish Name"]:
+            churches.append(data["Parish Name"])
+
+    data["Church Names"] = " | ".join(sorted(set(churches), key=len, reverse=True))
+
+    data["Email"] = " | ".join(sorted(set(EMAIL_RE.findall(full_text))))
+
+    valid_phones = set()
+    for p in set(PHONE_RE.findall(full_text)):
+        if len(DIGIT_RE.findall(p)) >= 7:
+            valid_phones.add(p.strip())
+    data["Phone"] = " | ".join(sorted(valid_phones))
+
+    # One pass over the lines: every line is cleaned once and checked for all three fields
+    priests = set()
+    secretary = set()
+    address_parts = {}
+    for line in full_text.split('\n'):
+        line_clean = clean_text(line)
+        if not line_clean:
+            continue
+
+        # The address pattern runs on the raw line, as it always has
+        if line_clean not in address_parts and ADDRESS_RE.search(line):
+            address_parts[line_clean] = None
+
+        lower_line = line_clean.lower()
+        if any(marker in lower_line for marker in PRIEST_MARKERS):
+            if lower_line.replace(":", "").strip() in TITLES_TO_SKIP:
+                continue
+            if len(line_clean) < 80 and not any(c.isdigit() for c in line_clean):
+                priests.add(line_clean)
+
+        if "secretary" in lower_line:
+            if ":" in line_clean or len(line_clean) < 50:
+                if lower_line.replace(":", "").strip() != "parish secretary":
+                    secretary.add(line_clean)
+
+    data["Priests"] = " | ".join(sorted(priests))
+    data["Secretary"] = " | ".join(sorted(secretary))
+    data["Address"] = " | ".join(address_parts)
+    return data
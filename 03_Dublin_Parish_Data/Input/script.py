@@ -1,33 +1,67 @@
 
-import requests
-from bs4 import BeautifulSoup
 import csv
-import re
-import time
 import os
+import threading
+
+from fetch_engine import FetchEngine
+from http_cache import CrawlCheckpoint, HttpCache
+from parish_extract import BACKENDS, DEFAULT_BACKEND, classify, clean_text, page_parts
 
 BASE_URL = "https://www.dublindiocese.ie/parishes-mass-times/parishes-a-z/"
-OUTPUT_PATH = os.path.join("..", "Output", "dublin_parishes.csv")
-LOG_PATH = os.path.join("..", "Processing", "extraction_log.txt")
+# Output/ and Processing/ are under here (see upwork.py for moving them)
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def project_paths(project_dir):
+    """(output CSV, log, HTTP cache folder, crawl checkpoint) of a project folder."""
+    return (os.path.join(project_dir, "Output", "dublin_parishes.csv"),
+            os.path.join(project_dir, "Processing", "extraction_log.txt"),
+            os.path.join(project_dir, "Processing", "http_cache"),
+            os.path.join(project_dir, "Processing", "crawl_checkpoint.json"))
+
+OUTPUT_PATH, LOG_PATH, CACHE_DIR, CHECKPOINT_PATH = project_paths(PROJECT_DIR)
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+PARSER_BACKEND = DEFAULT_BACKEND
+
+# Pages are fetched from several threads
+_log_lock = threading.Lock()
 
 def log_message(msg):
-    # Ensure log directory exists
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(msg + "\n")
-    print(msg)
-
-def clean_text(text):
-    if not text:
-        return ""
-    return " ".join(text.split()).strip()
-
-def get_parish_links():
-    log_message(f"Fetching main directory: {BASE_URL}")
+    with _log_lock:
+        # Ensure log directory exists
+        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(msg + "\n")
+        print(msg)
+
+def _get(url, headers=None):
+    import requests
+
+    response = requests.get(url, headers={**HEADERS, **(headers or {})})
+    response.raise_for_status()
+    return response
+
+def fetch(url, engine=None, cache=None, offline=False):
+    """Page content for url.
+
+    Goes through the engine's pooled connections when given (a one-off
+    request otherwise) and through the HttpCache when given, which
+    revalidates cached pages and, with offline=True, serves them without
+    any network access.
+    """
+    get = engine.get if engine is not None else _get
+    if cache is not None:
+        return cache.fetch(url, get, offline)
+    if offline:
+        raise KeyError(f"{url}: offline mode needs the cache")
+    return get(url).content
+
+def get_parish_links(engine=None, base_url=BASE_URL, cache=None, offline=False):
+    from bs4 import BeautifulSoup
+
+    log_message(f"Fetching main directory: {base_url}")
     try:
-        response = requests.get(BASE_URL, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        content = fetch(base_url, engine, cache, offline)
+        soup = BeautifulSoup(content, 'html.parser')
         
         links = []
         content_div = soup.find('div', class_='entry-content') or soup.find('div', id='content')
@@ -38,7 +72,7 @@ def get_parish_links():
 
         for a in content_div.find_all('a', href=True):
             href = a['href']
-            if '/parish/' in href and href != BASE_URL:
+            if '/parish/' in href and href != base_url:
                 if href not in links:
                     links.append(href)
         
@@ -48,7 +82,24 @@ def get_parish_links():
         log_message(f"CRITICAL ERROR fetching directory: {e}")
         return []
 
-def extract_details(url):
+def extract_details(url, engine=None, cache=None, offline=False):
+    return fetch_details(url, engine, cache, offline)[0]
+
+def fetch_details(url, engine=None, cache=None, offline=False):
+    """Fetch and parse a parish page; returns (row, whether the page was fetched)."""
+    try:
+        content = fetch(url, engine, cache, offline)
+    except Exception as e:
+        log_message(f"ERROR extracting {url}: {e}")
+        return parse_details(url, None), False
+    return parse_details(url, content), True
+
+def parse_details(url, content, backend=None):
+    """Extract the parish fields from a downloaded page (content=None gives an empty row).
+
+    backend picks the HTML parser (see parish_extract.BACKENDS); lxml is
+    used when installed.
+    """
     data = {
         "Parish Name": "",
         "Church Names": "",
@@ -60,111 +111,41 @@ def extract_details(url):
         "Parish URL": url
     }
     
+    if content is None:
+        return data
+
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        title, headers, full_text = page_parts(content, backend or PARSER_BACKEND)
         
         # 1. Parish Name
-        title = soup.find('h1')
         if title:
-            data["Parish Name"] = clean_text(title.get_text())
+            data["Parish Name"] = clean_text(title)
         
-        content = soup.find('div', class_='entry-content') or soup.find('div', id='content')
-        if not content:
+        if full_text is None:
             log_message(f"WARNING: No content found for {url}")
             return data
-            
-        full_text = content.get_text(separator="\n")
-        
-        # 2. Church Names
-        churches = []
-        generic_headers = ["Contact", "Mass Times", "Confession", "Sacraments", "Details", "Introduction", "Team", "Church Information", "Church Address", "Accessibility"]
-        
-        for header in content.find_all(['h2', 'h3', 'h4']):
-            text = clean_text(header.get_text())
-            if not text: 
-                continue
-            
-            is_generic = any(g.lower() == text.lower().replace(":", "").strip() for g in generic_headers)
-            if is_generic:
-                continue
-                
-            if len(text) > 3 and "parish" not in text.lower():
-                 start_keywords = ["Church", "St", "Saint", "Our Lady", "Holy", "Mary", "Blessed", "Sacred Heart", "Nativity", "Immaculate"]
-                 if any(k in text for k in start_keywords):
-                     churches.append(text)
-        
-        if not churches:
-            if "St" in data["Parish Name"] or "Church" in data["Parish Name"]:
-                churches.append(data["Parish Name"])
-        
-        data["Church Names"] = " | ".join(sorted(list(set(churches)), key=len, reverse=True))
-
-        # 3. Emails
-        emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', full_text))
-        data["Email"] = " | ".join(sorted(list(emails)))
-
-        # 4. Phones
-        phones = set(re.findall(r'(?:\(?0\d{1,3}\)?[\s\-\.]?)?\d{3}[\s\-\.]?\d{4}', full_text))
-        valid_phones = []
-        for p in phones:
-            digits = "".join(c for c in p if c.isdigit())
-            if len(digits) >= 7 and not (len(digits)==4 and p.startswith("20")):
-                valid_phones.append(p.strip())
-        
-        data["Phone"] = " | ".join(sorted(list(set(valid_phones))))
 
-        # 5. Priests & Secretary
-        priests = []
-        secretary = []
-        lines = full_text.split('\n')
-        
-        titles_to_skip = ["parish priest", "curate", "curates", "team", "moderator", "administrator", "parish chaplain", "co-parish priest", "chaplain", "priests of the parish", "priest in charge"]
-        
-        for line in lines:
-            line_clean = clean_text(line)
-            lower_line = line_clean.lower()
-            if not line_clean:
-                continue
-
-            # Priests
-            if any(marker in lower_line for marker in ["moderator", "co-pp", "curate", "adm", "chaplain", "parish priest", "very rev", "rev."]):
-                clean_lower = lower_line.replace(":", "").strip()
-                if clean_lower in titles_to_skip:
-                    continue
-                if len(line_clean) < 80 and not any(c.isdigit() for c in line_clean):
-                    priests.append(line_clean)
-            
-            # Secretary
-            if "secretary" in lower_line:
-                 if ":" in line_clean or len(line_clean) < 50:
-                     if lower_line.replace(":", "").strip() != "parish secretary":
-                         secretary.append(line_clean)
-        
-        data["Priests"] = " | ".join(sorted(list(set(priests))))
-        data["Secretary"] = " | ".join(sorted(list(set(secretary))))
-
-        # 6. Address
-        address_parts = []
-        seen_address = set()
-        for line in lines:
-            line_clean = clean_text(line)
-            if not line_clean: 
-                continue
-            if re.search(r'Dublin\s?\d+|Co\.?\s?(?:Dublin|Wicklow|Kildare)', line, re.IGNORECASE):
-                if line_clean not in seen_address:
-                    address_parts.append(line_clean)
-                    seen_address.add(line_clean)
-        
-        data["Address"] = " | ".join(address_parts)
+        # 2-6. Churches, emails, phones, priests/secretary and address
+        classify(data, headers, full_text)
 
     except Exception as e:
         log_message(f"ERROR extracting {url}: {e}")
 
     return data
 
-def main():
+def main(base_url=BASE_URL, concurrency=8, rate=5.0, retries=3, cache_dir=CACHE_DIR,
+         offline=False, restart=False):
+    """Crawl the directory into OUTPUT_PATH.
+
+    With cache_dir set, pages are kept in an HttpCache and only re-downloaded
+    when the server says they changed; offline=True rebuilds the CSV from the
+    cache alone. Finished rows are checkpointed, so an interrupted crawl
+    resumes where it stopped unless restart=True.
+    """
+    checkpoint = CrawlCheckpoint(CHECKPOINT_PATH, base_url)
+    if restart:
+        checkpoint.clear()
+
     if os.path.exists(OUTPUT_PATH):
         try:
             os.remove(OUTPUT_PATH)
@@ -172,36 +153,87 @@ def main():
             pass
             
     # Modify log path handling above or just rely on manual check
-    if os.path.exists(LOG_PATH):
+    # (kept when resuming, so the log covers the whole crawl)
+    if os.path.exists(LOG_PATH) and not checkpoint.rows:
         try:
             os.remove(LOG_PATH)
         except:
             pass
 
-    links = get_parish_links()
-    
-    # Ensure output dir exists
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    
-    with open(OUTPUT_PATH, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        fieldnames = ["Parish Name", "Church Names", "Priests", "Secretary", "Phone", "Email", "Address", "Parish URL"]
-        # USING COLON AS DELIMITER
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=':')
-        writer.writeheader()
-        
-        count = 0
-        total = len(links)
-        
-        for url in links:
-            count += 1
-            if count % 10 == 0 or count == 1 or count == total:
-                 print(f"[{count}/{total}] Processing {url}...")
-            
-            details = extract_details(url)
-            writer.writerow(details)
-            time.sleep(0.1)
-
+    cache = HttpCache(cache_dir) if cache_dir else None
+
+    with FetchEngine(concurrency=concurrency, rate=rate, retries=retries, headers=HEADERS) as engine:
+        links = get_parish_links(engine, base_url, cache, offline)
+
+        resumed = sum(1 for url in links if url in checkpoint)
+        if resumed:
+            log_message(f"Resuming crawl: {resumed} of {len(links)} parishes already done.")
+
+        def crawl(url):
+            if url in checkpoint:
+                return checkpoint.rows[url], False
+            return fetch_details(url, engine, cache, offline)
+
+        # Ensure output dir exists
+        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+
+        with open(OUTPUT_PATH, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            fieldnames = ["Parish Name", "Church Names", "Priests", "Secretary", "Phone", "Email", "Address", "Parish URL"]
+            # USING COLON AS DELIMITER
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=':')
+            writer.writeheader()
+
+            count = 0
+            total = len(links)
+
+            # Pages are fetched concurrently (paced by the engine's rate limit)
+            # but rows are written in directory order as soon as they are ready
+            try:
+                for url, (details, fetched) in zip(links, engine.map_ordered(crawl, links)):
+                    count += 1
+                    if count % 10 == 0 or count == 1 or count == total:
+                         print(f"[{count}/{total}] Processed {url}")
+                    writer.writerow(details)
+                    if fetched:
+                        checkpoint.add(url, details)
+            finally:
+                checkpoint.save()
+
+    # Only a complete crawl clears the checkpoint; failed pages are retried next run
+    if links and count == total and all(url in checkpoint for url in links):
+        checkpoint.clear()
+    if cache is not None:
+        log_message(f"Cache: {cache.stats['fresh']} downloaded, {cache.stats['not_modified']} unchanged, "
+                    f"{cache.stats['offline']} served offline.")
     print(f"Extraction complete. Data saved to {OUTPUT_PATH}")
 
+def cli(argv=None):
+    import argparse
+
+    global OUTPUT_PATH, LOG_PATH, CHECKPOINT_PATH, PARSER_BACKEND
+
+    output_path, log_path, cache_dir, checkpoint_path = project_paths(PROJECT_DIR)
+    arg_parser = argparse.ArgumentParser(description="Scrape the Dublin Diocese parish directory.")
+    arg_parser.add_argument('--base-url', default=BASE_URL, help="Directory page (point at a local copy for testing)")
+    arg_parser.add_argument('--concurrency', type=int, default=8, help="Pages fetched in parallel")
+    arg_parser.add_argument('--rate', type=float, default=5.0, help="Max requests per second (0 = unlimited)")
+    arg_parser.add_argument('--retries', type=int, default=3, help="Retries per page on connection errors, 429 and 5xx")
+    arg_parser.add_argument('--cache-dir', default=cache_dir, help="HTTP cache folder (ETag/Last-Modified revalidation)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Always download every page")
+    arg_parser.add_argument('--offline', action='store_true', help="Rebuild the CSV from cached pages only")
+    arg_parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND, help="HTML parser backend")
+    arg_parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint of an interrupted crawl")
+    arg_parser.add_argument('--output', default=output_path, help="CSV to write")
+    arg_parser.add_argument('--log', default=log_path, help="Extraction log")
+    arg_parser.add_argument('--checkpoint', default=checkpoint_path, help="Checkpoint of an interrupted crawl")
+    args = arg_parser.parse_args(argv)
+    if args.offline and args.no_cache:
+        arg_parser.error("--offline replays the cache, it can't be combined with --no-cache")
+    OUTPUT_PATH, LOG_PATH, CHECKPOINT_PATH = args.output, args.log, args.checkpoint
+    PARSER_BACKEND = args.parser
+
+    main(args.base_url, args.concurrency, args.rate, args.retries,
+         cache_dir=None if args.no_cache else args.cache_dir, offline=args.offline, restart=args.restart)
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,201 @@
+"""Benchmark the convert_data pipeline on deterministic synthetic feeds.
+
+Times each stage (parse, merge, column cleanup, CSV write, XLSX write),
+reports throughput and peak memory, and compares with a stored baseline:
+
+    python bench_convert.py --profile medium --save-baseline bench_medium.json
+    python bench_convert.py --profile medium --baseline bench_medium.json
+
+A plain run of the small profile is compared with bench_baseline.json next
+to this file (--no-baseline skips that). Its timings come from the machine
+that recorded it; after changing machines, record your own with
+`python bench_convert.py --save-baseline bench_baseline.json`.
+
+Exits with status 1 when a stage is slower (or uses more memory) than the
+baseline by more than --tolerance.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# convert_data imports these where it first needs them; load them up front so
+# their one-time import isn't timed as part of the first stage
+import pandas  # noqa: F401
+import fitment_index  # noqa: F401
+import pies_frame  # noqa: F401
+
+from catalog_export import StreamingWorkbookWriter, iter_rows
+from convert_data import AcesParser, PiesParser, drop_empty_columns, merge_aces, merge_catalog, merge_pies
+from synthetic_feeds import PROFILES, generate_drop
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Baseline of the small profile, used when no other is given
+DEFAULT_PROFILE = 'small'
+DEFAULT_BASELINE = os.path.join(HERE, 'bench_baseline.json')
+
+class StageTimer:
+    """Runs stages, recording wall time and (optionally) tracemalloc peak per stage."""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def run(self, name, fn, records=None, unit=None):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = fn()
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        stage = {'seconds': round(elapsed, 4)}
+        if peak is not None:
+            stage['peak_mb'] = round(peak / 1024 / 1024, 2)
+        if records:
+            stage['records'] = records
+            stage[f'{unit}_per_s'] = round(records / elapsed) if elapsed else None
+        self.stages[name] = stage
+        return result
+
+def run_benchmark(output_dir, counts, trace_memory=True):
+    timer = StageTimer(trace_memory)
+
+    pies_items = sum(n for _, n in counts['pies'])
+    aces_apps = sum(n for _, n in counts['aces'])
+
+    all_pies = timer.run('parse_pies', lambda: [PiesParser(p).parse() for p, _ in counts['pies']],
+                         pies_items, 'items')
+    all_aces = timer.run('parse_aces', lambda: [AcesParser(p).collect() for p, _ in counts['aces']],
+                         aces_apps, 'apps')
+
+    def merge():
+        return merge_catalog(merge_pies(all_pies), merge_aces(all_aces))
+
+    final_df = timer.run('merge', merge, pies_items, 'items')
+    timer.run('column_cleanup', lambda: drop_empty_columns(final_df))
+
+    rows = len(final_df)
+    header = [str(c) for c in final_df.columns]
+
+    def write_csv():
+        with open(os.path.join(output_dir, 'bench.csv'), 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh, lineterminator=os.linesep)
+            writer.writerow(header)
+            writer.writerows(iter_rows(final_df))
+
+    def write_xlsx():
+        xlsx = StreamingWorkbookWriter(os.path.join(output_dir, 'bench.xlsx'), header)
+        for row in iter_rows(final_df):
+            xlsx.append(row)
+        xlsx.close()
+
+    timer.run('csv_write', write_csv, rows, 'rows')
+    timer.run('xlsx_write', write_xlsx, rows, 'rows')
+    return timer.stages
+
+def compare(stages, baseline, tolerance):
+    """Return a list of human-readable regressions against the baseline stages."""
+    regressions = []
+    for name, base in baseline.get('stages', {}).items():
+        current = stages.get(name)
+        if current is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if metric in base and metric in current and base[metric]:
+                ratio = current[metric] / base[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append(f"{name}.{metric}: {current[metric]} vs baseline {base[metric]} "
+                                       f"(+{(ratio - 1) * 100:.0f}%)")
+    return regressions
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark convert_data on synthetic ACES/PIES feeds.")
+    arg_parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    arg_parser.add_argument('--pies-items', type=int, help="Override the profile's PIES item count")
+    arg_parser.add_argument('--attributes', type=int, help="Override the profile's attributes per item")
+    arg_parser.add_argument('--aces-apps', type=int, help="Override the profile's ACES App count")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--data-dir', help="Keep generated feeds/outputs here instead of a temp folder")
+    arg_parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (pure timings)")
+    arg_parser.add_argument('--report', help="Write the JSON report to this path")
+    arg_parser.add_argument('--baseline', help="Compare against this baseline report "
+                                               "(default for the small profile: bench_baseline.json)")
+    arg_parser.add_argument('--no-baseline', action='store_true', help="Don't compare against any baseline")
+    arg_parser.add_argument('--save-baseline', help="Write this run as the new baseline")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = arg_parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    params = dict(PROFILES[args.profile])
+    for key in ('pies_items', 'attributes', 'aces_apps'):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    if args.no_baseline:
+        args.baseline = None
+    elif args.baseline is None and params == PROFILES[DEFAULT_PROFILE] and not args.save_baseline:
+        args.baseline = DEFAULT_BASELINE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.data_dir or tmp
+        input_dir = os.path.join(work_dir, 'Input')
+        output_dir = os.path.join(work_dir, 'Output')
+        os.makedirs(output_dir, exist_ok=True)
+
+        counts = generate_drop(input_dir, params['pies_items'], params['attributes'], params['aces_apps'], args.seed)
+        input_mb = sum(os.path.getsize(p) for group in counts.values() for p, _ in group) / 1024 / 1024
+        stages = run_benchmark(output_dir, counts, trace_memory=not args.no_memory)
+
+    report = {
+        'profile': args.profile,
+        'params': params,
+        'input_mb': round(input_mb, 1),
+        'trace_memory': not args.no_memory,
+        'python': platform.python_version(),
+        'stages': stages,
+    }
+
+    print(f"Profile {args.profile}: {params} ({report['input_mb']} MB of XML)")
+    for name, stage in stages.items():
+        extra = ", ".join(f"{k}={v}" for k, v in stage.items() if k != 'seconds')
+        print(f"  {name:<15} {stage['seconds']:>9.3f}s  {extra}")
+
+    if args.report:
+        with open(args.report, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if baseline.get('params') != params:
+            print(f"WARNING: baseline was recorded with {baseline.get('params')}")
+        if baseline.get('trace_memory') != report['trace_memory']:
+            # tracemalloc slows everything down, timings are only comparable like for like
+            print("WARNING: baseline and this run differ in --no-memory, timings are not comparable")
+        regressions = compare(stages, baseline, args.tolerance)
+        if regressions:
+            print("PERFORMANCE REGRESSION:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
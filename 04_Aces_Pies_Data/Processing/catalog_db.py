@@ -0,0 +1,230 @@
+import logging
+import os
+import sqlite3
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE parts (
+    part_id INTEGER PRIMARY KEY,
+    part_number TEXT NOT NULL UNIQUE,
+    brand TEXT,
+    description TEXT,
+    features TEXT,
+    images TEXT
+);
+CREATE TABLE attributes (
+    part_id INTEGER NOT NULL REFERENCES parts(part_id),
+    name TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE vehicles (
+    vehicle_id INTEGER PRIMARY KEY,
+    base_vehicle_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE fitment (
+    part_id INTEGER NOT NULL REFERENCES parts(part_id),
+    vehicle_id INTEGER NOT NULL REFERENCES vehicles(vehicle_id),
+    PRIMARY KEY (part_id, vehicle_id)
+) WITHOUT ROWID;
+CREATE TABLE vehicle_labels (
+    part_id INTEGER NOT NULL REFERENCES parts(part_id),
+    label TEXT NOT NULL
+);
+"""
+
+# Created after the bulk load, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX fitment_by_vehicle ON fitment (vehicle_id, part_id);
+CREATE INDEX attributes_by_part ON attributes (part_id);
+CREATE INDEX attributes_by_name_value ON attributes (name, value);
+CREATE INDEX vehicle_labels_by_part ON vehicle_labels (part_id);
+CREATE INDEX vehicle_labels_by_label ON vehicle_labels (label);
+"""
+
+# PIES columns stored on the parts table; Attribute_* columns go to attributes
+PART_COLUMNS = {'Brand': 'brand', 'Description': 'description', 'Features': 'features', 'Images': 'images'}
+ATTRIBUTE_PREFIX = 'Attribute_'
+
+def _column_values(df, column):
+    """Column as a list with None for missing cells (or all None if absent)."""
+    if column not in df.columns:
+        return [None] * len(df)
+    s = df[column]
+    return s.astype(object).where(s.notna(), None).tolist()
+
+def write_catalog_db(db_path, items_df, fitment=None):
+    """Bulk-load the merged PIES items and full ACES fitment into SQLite.
+
+    items_df is the de-duplicated PIES frame (one row per PartNumber);
+    fitment is the {column: FitmentIndex} mapping from process_directory.
+    Parts that only appear in ACES get a parts row without PIES details.
+    The database is built in a temp file and moved into place when done.
+    """
+    fitment = fitment or {}
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        part_numbers = _column_values(items_df, 'PartNumber')
+        part_ids = {p: i for i, p in enumerate(part_numbers, start=1)}
+        detail_columns = [_column_values(items_df, c) for c in PART_COLUMNS]
+        conn.executemany(
+            "INSERT INTO parts VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, p, *details) for i, (p, *details) in enumerate(zip(part_numbers, *detail_columns), start=1)),
+        )
+
+        for column in items_df.columns:
+            if not column.startswith(ATTRIBUTE_PREFIX):
+                continue
+            name = column[len(ATTRIBUTE_PREFIX):]
+            conn.executemany(
+                "INSERT INTO attributes VALUES (?, ?, ?)",
+                ((i, name, v) for i, v in enumerate(_column_values(items_df, column), start=1) if v is not None),
+            )
+
+        def part_codes(index):
+            # FitmentIndex part code -> part_id, adding ACES-only parts as they come
+            codes = np.empty(len(index.parts), dtype=np.int64)
+            new_parts = []
+            for code, p in enumerate(index.parts):
+                part_id = part_ids.get(p)
+                if part_id is None:
+                    part_id = part_ids[p] = len(part_ids) + 1
+                    new_parts.append((part_id, p))
+                codes[code] = part_id
+            conn.executemany("INSERT INTO parts (part_id, part_number) VALUES (?, ?)", new_parts)
+            return codes
+
+        ids = fitment.get('VehicleIDs')
+        if ids is not None:
+            codes = part_codes(ids)
+            conn.executemany(
+                "INSERT INTO vehicles VALUES (?, ?)",
+                ((j, v) for j, v in enumerate(ids.vehicles, start=1)),
+            )
+            rows = np.repeat(codes, np.diff(ids.indptr))
+            conn.executemany(
+                "INSERT INTO fitment VALUES (?, ?)",
+                zip(rows.tolist(), (ids.indices + 1).tolist()),
+            )
+
+        labels = fitment.get('Vehicles')
+        if labels is not None:
+            codes = part_codes(labels)
+            rows = np.repeat(codes, np.diff(labels.indptr))
+            conn.executemany(
+                "INSERT INTO vehicle_labels VALUES (?, ?)",
+                zip(rows.tolist(), labels.vehicles[labels.indices].tolist()),
+            )
+
+        conn.executescript(INDEXES)
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    logging.info(f"Loaded {len(part_ids)} parts into {db_path}")
+
+class CatalogDB:
+    """Read-only query API over a database written by write_catalog_db."""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def parts_for_vehicle(self, base_vehicle_id):
+        """Part numbers that fit a BaseVehicle id."""
+        rows = self.conn.execute(
+            "SELECT p.part_number FROM vehicles v"
+            " JOIN fitment f ON f.vehicle_id = v.vehicle_id"
+            " JOIN parts p ON p.part_id = f.part_id"
+            " WHERE v.base_vehicle_id = ? ORDER BY p.part_number",
+            (str(base_vehicle_id),),
+        )
+        return [r[0] for r in rows]
+
+    def vehicles_for_part(self, part_number):
+        """BaseVehicle ids a part fits, in numeric order."""
+        rows = self.conn.execute(
+            "SELECT v.base_vehicle_id FROM parts p"
+            " JOIN fitment f ON f.part_id = p.part_id"
+            " JOIN vehicles v ON v.vehicle_id = f.vehicle_id"
+            " WHERE p.part_number = ? ORDER BY v.vehicle_id",
+            (part_number,),
+        )
+        return [r[0] for r in rows]
+
+    def labels_for_part(self, part_number):
+        """Year/Make/Model labels for a part (only when built with a VCdb)."""
+        rows = self.conn.execute(
+            "SELECT l.label FROM parts p JOIN vehicle_labels l ON l.part_id = p.part_id"
+            " WHERE p.part_number = ? ORDER BY l.label",
+            (part_number,),
+        )
+        return [r[0] for r in rows]
+
+    def part(self, part_number):
+        """PIES details and attributes of a part as a dict, or None if unknown."""
+        row = self.conn.execute(
+            "SELECT part_id, part_number, brand, description, features, images FROM parts WHERE part_number = ?",
+            (part_number,),
+        ).fetchone()
+        if row is None:
+            return None
+        part_id, *values = row
+        details = dict(zip(['PartNumber'] + list(PART_COLUMNS), values))
+        for name, value in self.conn.execute(
+                "SELECT name, value FROM attributes WHERE part_id = ? ORDER BY rowid", (part_id,)):
+            details[ATTRIBUTE_PREFIX + name] = value
+        return details
+
+    def parts_with_attribute(self, name, value):
+        """Part numbers whose Attribute_<name> equals value."""
+        rows = self.conn.execute(
+            "SELECT p.part_number FROM attributes a JOIN parts p ON p.part_id = a.part_id"
+            " WHERE a.name = ? AND a.value = ? ORDER BY p.part_number",
+            (name.replace(' ', '_'), value),
+        )
+        return [r[0] for r in rows]
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Query the consolidated catalog database.")
+    arg_parser.add_argument('db_path', help="Consolidated_Catalog.db written by convert_data.py --sqlite")
+    group = arg_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--vehicle', help="List parts that fit this BaseVehicle id")
+    group.add_argument('--part', help="Show a part and the vehicles it fits")
+    args = arg_parser.parse_args()
+
+    with CatalogDB(args.db_path) as db:
+        if args.vehicle:
+            for part_number in db.parts_for_vehicle(args.vehicle):
+                print(part_number)
+        else:
+            details = db.part(args.part)
+            if details is None:
+                print(f"Unknown part: {args.part}")
+                raise SystemExit(1)
+            for key, value in details.items():
+                if value is not None:
+                    print(f"{key}: {value}")
+            print(f"VehicleIDs: {','.join(db.vehicles_for_part(args.part))}")
+            labels = db.labels_for_part(args.part)
+            if labels:
+                print(f"Vehicles: {'; '.join(labels)}")
@@ -0,0 +1,120 @@
+import csv
+import logging
+import os
+
+# Excel hard limits: rows per sheet (incl. header) and columns
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLS = 16384
+
+class StreamingWorkbookWriter:
+    """Row-by-row XLSX writer that rolls over to new sheets and numbered files.
+
+    Uses openpyxl's write-only mode, so rows are streamed to disk and memory
+    stays flat. When a sheet is full the next one (Sheet2, ...) is started with
+    the header repeated; after sheets_per_workbook sheets the next rows go to
+    <name>_2.xlsx, <name>_3.xlsx, ...
+    """
+
+    def __init__(self, xlsx_path, header, rows_per_sheet=EXCEL_MAX_ROWS - 1,
+                 sheets_per_workbook=4):
+        if len(header) > EXCEL_MAX_COLS:
+            raise ValueError(f"{len(header)} columns exceeds Excel's limit of {EXCEL_MAX_COLS}")
+        self.xlsx_path = xlsx_path
+        self.header = list(header)
+        self.rows_per_sheet = rows_per_sheet
+        self.sheets_per_workbook = sheets_per_workbook
+        self.paths = []
+        self._wb = None
+        self._ws = None
+        self._sheet_rows = 0
+        self._sheet_count = 0
+
+    def _workbook_path(self, n):
+        if n == 1:
+            return self.xlsx_path
+        base, ext = os.path.splitext(self.xlsx_path)
+        return f"{base}_{n}{ext}"
+
+    def _save_workbook(self):
+        if self._wb is not None:
+            self._wb.save(self.paths[-1])
+            self._wb = None
+
+    def _new_sheet(self):
+        from openpyxl import Workbook
+
+        if self._wb is None or self._sheet_count == self.sheets_per_workbook:
+            self._save_workbook()
+            self._wb = Workbook(write_only=True)
+            self._sheet_count = 0
+            self.paths.append(self._workbook_path(len(self.paths) + 1))
+        self._sheet_count += 1
+        # Same sheet naming as DataFrame.to_excel for the first sheet
+        self._ws = self._wb.create_sheet(f"Sheet{self._sheet_count}")
+        self._ws.append(self.header)
+        self._sheet_rows = 0
+
+    def append(self, row):
+        if self._ws is None or self._sheet_rows == self.rows_per_sheet:
+            self._new_sheet()
+        self._ws.append(row)
+        self._sheet_rows += 1
+
+    def close(self):
+        if self._ws is None:
+            # Header-only workbook for an empty catalog
+            self._new_sheet()
+        self._save_workbook()
+
+        # Remove numbered workbooks left over from a bigger previous run
+        n = len(self.paths) + 1
+        while os.path.exists(self._workbook_path(n)):
+            os.remove(self._workbook_path(n))
+            n += 1
+
+def iter_rows(df, chunk_rows=50000):
+    """Yield df rows as tuples with None for missing cells, converting chunk by chunk."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [chunk[c].astype(object).where(chunk[c].notna(), None).tolist() for c in chunk.columns]
+        yield from zip(*columns)
+
+def export_catalog(df, csv_path, xlsx_path=None, chunk_rows=50000, **xlsx_options):
+    """Write df to CSV and (optionally) XLSX in a single pass over its rows.
+
+    Rows are converted chunk by chunk, so only chunk_rows rows are ever held
+    as Python objects. The CSV matches DataFrame.to_csv(index=False). XLSX
+    failures are logged and don't stop the CSV.
+    Returns the list of workbook paths written.
+    """
+    header = [str(c) for c in df.columns]
+
+    xlsx = None
+    if xlsx_path:
+        try:
+            xlsx = StreamingWorkbookWriter(xlsx_path, header, **xlsx_options)
+        except Exception as e:
+            logging.error(f"Failed to save Excel: {e}")
+
+    with open(csv_path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh, lineterminator=os.linesep)
+        writer.writerow(header)
+
+        for row in iter_rows(df, chunk_rows):
+            # csv writes None as an empty field, like to_csv does for NaN
+            writer.writerow(row)
+            if xlsx is not None:
+                try:
+                    xlsx.append(row)
+                except Exception as e:
+                    logging.error(f"Failed to save Excel: {e}")
+                    xlsx = None
+
+    paths = []
+    if xlsx is not None:
+        try:
+            xlsx.close()
+            paths = xlsx.paths
+        except Exception as e:
+            logging.error(f"Failed to save Excel: {e}")
+    return paths
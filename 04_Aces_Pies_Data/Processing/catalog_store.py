@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    digest TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    stamp TEXT NOT NULL,
+    applied TEXT NOT NULL,
+    upserts INTEGER NOT NULL,
+    deletes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    part_number TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL,
+    deleted INTEGER NOT NULL,
+    record TEXT
+);
+CREATE TABLE IF NOT EXISTS apps (
+    part_number TEXT NOT NULL,
+    base_vehicle_id TEXT NOT NULL,
+    submodel_id TEXT NOT NULL,
+    app_key BLOB NOT NULL,
+    stamp TEXT NOT NULL,
+    deleted INTEGER NOT NULL,
+    PRIMARY KEY (part_number, base_vehicle_id, submodel_id, app_key)
+) WITHOUT ROWID;
+"""
+
+# A row only changes when the incoming feed is at least as recent as the one
+# that last wrote it, so a late-arriving older feed can't undo a newer one
+UPSERT_ITEM = """
+INSERT INTO items (part_number, stamp, deleted, record) VALUES (?, ?, ?, ?)
+ON CONFLICT (part_number) DO UPDATE SET stamp = excluded.stamp, deleted = excluded.deleted, record = excluded.record
+WHERE excluded.stamp >= items.stamp
+"""
+UPSERT_APP = """
+INSERT INTO apps (part_number, base_vehicle_id, submodel_id, app_key, stamp, deleted) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (part_number, base_vehicle_id, submodel_id, app_key) DO UPDATE SET stamp = excluded.stamp, deleted = excluded.deleted
+WHERE excluded.stamp >= apps.stamp
+"""
+
+# PIES Item MaintenanceType / ACES App action that removes the record
+DELETE_CODE = 'D'
+
+def feed_stamp(header, label):
+    """Order key of a feed: effective date, then transfer date, then file name.
+
+    ISO dates compare correctly as text; feeds without dates sort first.
+    """
+    effective = header.get('EffectiveDate') or header.get('BlanketEffectiveDate') or ''
+    return f"{effective}|{header.get('TransferDate') or ''}|{os.path.basename(label)}"
+
+def _app_key(qualifiers):
+    # Apps are identified by their content; the qualifier text is hashed to keep the key small
+    return hashlib.blake2b(qualifiers.encode('utf-8'), digest_size=8).digest()
+
+class CatalogStore:
+    """Persistent PIES item / ACES App store that feeds are applied to as deltas.
+
+    Items are keyed on PartNumber and Apps on part + BaseVehicle + SubModel +
+    their remaining qualifiers (position, notes, ...). MaintenanceType="D" /
+    action="D" records leave a tombstone instead of a row, and every row is
+    stamped with the feed that last wrote it (see feed_stamp), so the stored
+    catalog is the same whatever order the feeds arrive in. Feeds are
+    remembered by content digest and never applied twice.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_feed(self, digest):
+        return self.conn.execute("SELECT 1 FROM feeds WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def latest_stamp(self):
+        """Stamp of the most recent feed applied so far ('' for an empty store)."""
+        row = self.conn.execute("SELECT MAX(stamp) FROM feeds").fetchone()
+        return row[0] or ''
+
+    def _apply(self, sql, rows, digest, label, kind, stamp):
+        # rows yield (is_delete, params); one transaction per feed, so a feed
+        # that fails halfway is rolled back and picked up again next run
+        counts = {'upserts': 0, 'deletes': 0}
+
+        def params():
+            for is_delete, row in rows:
+                counts['deletes' if is_delete else 'upserts'] += 1
+                yield row
+
+        with self.conn:
+            self.conn.executemany(sql, params())
+            self.conn.execute(
+                "INSERT INTO feeds VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, label, kind, stamp, time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 counts['upserts'], counts['deletes']),
+            )
+        return counts
+
+    def apply_items(self, digest, label, stamp, items):
+        """Apply (MaintenanceType, item record) pairs of one PIES feed; returns upsert/delete counts."""
+        def rows():
+            for maintenance_type, record in items:
+                if maintenance_type == DELETE_CODE:
+                    yield True, (record['PartNumber'], stamp, 1, None)
+                else:
+                    yield False, (record['PartNumber'], stamp, 0, json.dumps(record))
+        return self._apply(UPSERT_ITEM, rows(), digest, label, 'PIES', stamp)
+
+    def apply_apps(self, digest, label, stamp, apps):
+        """Apply (action, part, BaseVehicle id, SubModel id, qualifiers) of one ACES feed."""
+        def rows():
+            for action, part_num, bv_id, submodel_id, qualifiers in apps:
+                is_delete = action == DELETE_CODE
+                yield is_delete, (part_num, bv_id, submodel_id or '', _app_key(qualifiers), stamp, int(is_delete))
+        return self._apply(UPSERT_APP, rows(), digest, label, 'ACES', stamp)
+
+    def items_frame(self):
+        """Live items as one row per PartNumber, in PartNumber order."""
+        from pies_frame import PiesFrameBuilder
+
+        builder = PiesFrameBuilder()
+        for (record,) in self.conn.execute(
+                "SELECT record FROM items WHERE deleted = 0 ORDER BY part_number"):
+            builder.add(json.loads(record))
+        return builder.build()
+
+    def fitment(self, resolver=None):
+        """Live fitment as {column: FitmentIndex}, like process_directory builds from the feeds.
+
+        With a vcdb.VcdbResolver the Vehicles labels are resolved too.
+        """
+        from fitment_index import FitmentIndexBuilder
+
+        ids = FitmentIndexBuilder()
+        labels = FitmentIndexBuilder() if resolver is not None else None
+        for part_num, bv_id, submodel_id in self.conn.execute(
+                "SELECT part_number, base_vehicle_id, submodel_id FROM apps WHERE deleted = 0"):
+            ids.add(part_num, bv_id)
+            if labels is not None:
+                label = resolver.resolve(bv_id, submodel_id or None)
+                if label:
+                    labels.add(part_num, label)
+
+        result = {'VehicleIDs': ids.build()}
+        if labels is not None:
+            result['Vehicles'] = labels.build()
+        return result
+
+    def summary(self):
+        """Counts of feeds, live items/apps and tombstones, for logging."""
+        count = lambda sql: self.conn.execute(sql).fetchone()[0]
+        return {
+            'feeds': count("SELECT COUNT(*) FROM feeds"),
+            'items': count("SELECT COUNT(*) FROM items WHERE deleted = 0"),
+            'deleted_items': count("SELECT COUNT(*) FROM items WHERE deleted = 1"),
+            'apps': count("SELECT COUNT(*) FROM apps WHERE deleted = 0"),
+            'deleted_apps': count("SELECT COUNT(*) FROM apps WHERE deleted = 1"),
+        }
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    arg_parser = argparse.ArgumentParser(description="Show the feeds applied to a catalog store.")
+    arg_parser.add_argument('db_path', help="Store written by convert_data.py --store")
+    args = arg_parser.parse_args()
+
+    with CatalogStore(args.db_path) as store:
+        for row in store.conn.execute(
+                "SELECT stamp, kind, label, upserts, deletes, applied FROM feeds ORDER BY stamp"):
+            print(" | ".join(str(v) for v in row))
+        for key, value in store.summary().items():
+            print(f"{key}: {value}")
@@ -1,213 +1,938 @@
+import io
+import mmap
 import os
+import queue
+import threading
+import zipfile
 import xml.etree.ElementTree as ET
-import pandas as pd
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
+from catalog_export import export_catalog
+from catalog_store import DELETE_CODE, CatalogStore, feed_stamp
+from kit_graph import KIT_COLUMN, resolve_kits
+from parse_cache import ParseCache, content_digest
+from run_metrics import RunReport, measure, profiling
+
+# pandas/numpy and the modules built on them (catalog_db, fitment_index,
+# pies_frame, text_index, vcdb) are imported where they're needed, so
+# `--help` and the upwork.py CLI don't pay for them
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Project folder holding Input/ and Output/ (upwork.py points it at the configured one)
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def stream_elements(source, resolve_tag):
+    """Yield every completed element whose tag matches, then free it.
+
+    resolve_tag is called once with the root element and returns the full
+    (namespaced) tag to collect, so callers can settle the namespace per file.
+    Each element is cleared and dropped from its parent once the consumer
+    moves on, so only one record is held in memory at a time.
+    """
+    tag = None
+    stack = []
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if tag is None:
+                tag = resolve_tag(elem)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if elem.tag == tag:
+            yield elem
+            elem.clear()
+            if stack:
+                del stack[-1][:]
+
+class ReadAheadReader:
+    """File-like wrapper that decompresses/reads a stream on a background thread.
+
+    Zip members are inflated by zlib (which releases the GIL) while the parser
+    consumes earlier chunks, so decompression and parsing overlap.
+    """
+
+    def __init__(self, raw, chunk_size=1 << 20, depth=4):
+        self.raw = raw
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._buf = b""
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self.raw.read(self.chunk_size)
+                if not chunk:
+                    break
+                if not self._put(chunk):
+                    return
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def read(self, size=-1):
+        out = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            if self._pos >= len(self._buf):
+                if self._eof:
+                    break
+                chunk = self._queue.get()
+                if chunk is None:
+                    self._eof = True
+                    break
+                if isinstance(chunk, Exception):
+                    self._eof = True
+                    raise chunk
+                self._buf, self._pos = chunk, 0
+
+            end = len(self._buf) if size < 0 else min(len(self._buf), self._pos + remaining)
+            out.append(self._buf[self._pos:end])
+            remaining -= end - self._pos
+            self._pos = end
+        return b"".join(out)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def parser_for(name):
+    """Pick the parser class from a file or archive member name (None if neither)."""
+    lower = os.path.basename(name).lower()
+    if not lower.endswith('.xml'):
+        return None
+    # Covers the _Kit/_Kits variants too (e.g. 7E-2025-11-30-Pies_Kits.xml)
+    if 'pies' in lower:
+        return PiesParser
+    if 'aces' in lower:
+        return AcesParser
+    return None
+
+def iter_input_sources(input_dir):
+    """Yield (label, parser class, path, member) for every XML feed under input_dir.
+
+    Loose .xml files come back with member=None; .zip drops are listed member
+    by member so they can be read straight out of the archive, without
+    extracting anything to disk.
+    """
+    for root_dir, dirs, files in os.walk(input_dir):
+        # os.walk order is up to the filesystem; sort so runs are reproducible
+        dirs.sort()
+        for f in sorted(files):
+            full_path = os.path.join(root_dir, f)
+            if f.lower().endswith('.zip'):
+                try:
+                    with zipfile.ZipFile(full_path) as zf:
+                        members = [info for info in zf.infolist() if not info.is_dir()]
+                except zipfile.BadZipFile as e:
+                    logging.error(f"Error reading archive {full_path}: {e}")
+                    continue
+                for info in members:
+                    parser_cls = parser_for(info.filename)
+                    if parser_cls is not None:
+                        yield os.path.join(full_path, info.filename), parser_cls, full_path, info.filename
+            else:
+                parser_cls = parser_for(f)
+                if parser_cls is not None:
+                    yield full_path, parser_cls, full_path, None
+
+def open_zip_member(archive_path, member):
+    """Open a zip member as a read-ahead stream; closing it closes the archive."""
+    zf = zipfile.ZipFile(archive_path)
+    try:
+        raw = zf.open(member)
+    except Exception:
+        zf.close()
+        raise
+
+    reader = ReadAheadReader(raw)
+    close_member = reader.close
+
+    def close():
+        close_member()
+        zf.close()
+
+    reader.close = close
+    return reader
+
+def split_aces_ranges(path, shard_bytes):
+    """Cut a loose ACES file into byte ranges that each hold whole <App> elements.
+
+    Returns (head, tail, ranges): head/tail wrap every range back into a
+    well-formed document (XML declaration + root start tag / root end tag).
+    Returns None when the file is small enough to parse in one piece or its
+    layout isn't recognised.
+    """
+    size = os.path.getsize(path)
+    if size <= shard_bytes:
+        return None
+
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Root start tag is the first tag that isn't a declaration/comment/PI
+        pos = 0
+        while True:
+            pos = mm.find(b'<', pos)
+            if pos < 0 or mm[pos + 1:pos + 2] not in (b'?', b'!'):
+                break
+            pos += 1
+        if pos < 0:
+            return None
+        root_end = mm.find(b'>', pos)
+        root_name = mm[pos + 1:root_end].split()[0].rstrip(b'/')
+        head = mm[:pos] + mm[pos:root_end + 1]
+        tail = b'</' + root_name + b'>'
+
+        def next_app(offset):
+            while True:
+                offset = mm.find(b'<App', offset)
+                if offset < 0 or mm[offset + 4:offset + 5] in (b' ', b'>', b'/', b'\t', b'\r', b'\n'):
+                    return offset
+                offset += 4
+
+        first = next_app(root_end)
+        last = mm.rfind(b'</App>')
+        if first < 0 or last < first:
+            return None
+        last += len(b'</App>')
+
+        starts = [first]
+        for nominal in range(first + shard_bytes, last, shard_bytes):
+            start = next_app(max(nominal, starts[-1] + 1))
+            if start < 0 or start >= last:
+                break
+            starts.append(start)
+
+    ranges = list(zip(starts, starts[1:] + [last]))
+    return head, tail, ranges
+
+def parse_source(parser_cls, label, path, member=None, byte_range=None, vcdb=None, metrics=None):
+    """Parse one feed (or one byte range of a loose ACES file) into a compact result.
+
+    Module-level so it can run in a worker process. PIES gives a DataFrame,
+    ACES gives {column: FitmentIndex}, which shards of the same file merge
+    into. vcdb is the VCdb folder used to resolve vehicle labels for ACES;
+    each worker maps it once. metrics (a run_metrics.Measurement) gets the
+    number of Items/Apps read. Returns None on error.
+    """
+    try:
+        kwargs = {}
+        if parser_cls is AcesParser and vcdb:
+            from vcdb import open_vcdb
+
+            kwargs['resolver'] = open_vcdb(vcdb)
+
+        if byte_range is not None:
+            head, tail, start, end = byte_range
+            with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                stream = io.BytesIO(head + mm[start:end] + tail)
+            parser = parser_cls(f"{label} [bytes {start}-{end}]", stream, **kwargs)
+        elif member is not None:
+            stream = open_zip_member(path, member)
+            parser = parser_cls(label, stream, **kwargs)
+        else:
+            stream = None
+            parser = parser_cls(label, **kwargs)
+
+        try:
+            if parser_cls is AcesParser:
+                return parser.collect()
+            return parser.parse()
+        finally:
+            if metrics is not None:
+                metrics.records = parser.records
+            if stream is not None:
+                stream.close()
+    except Exception as e:
+        logging.error(f"Error parsing {label}: {e}")
+        return None
+
+def _parse_task(task):
+    """Run parse_source in a worker; returns (result, per-task metrics)."""
+    unit = 'apps' if task[0] is AcesParser else 'items'
+    with measure(unit) as m:
+        result = parse_source(*task, metrics=m)
+    stats = dict(m.stats)
+    # ru_maxrss is the worker's high-water mark over every task it has run so
+    # far, not this task's, so it is reported once per worker (see RunReport)
+    stats['worker'] = os.getpid()
+    stats['worker_peak_rss_mb'] = stats.pop('peak_rss_mb')
+    return result, stats
+
 class PiesParser:
-    def __init__(self, filepath):
+    NS_URI = 'http://www.autocare.org'
+    # Bump whenever the parsed output changes, so cached results are invalidated
+    VERSION = 4
+
+    def __init__(self, filepath, source=None):
+        # source: optional open binary stream (e.g. a zip member); filepath is then just a label
         self.filepath = filepath
-        self.ns = {'ns': 'http://www.autocare.org'}
+        self.source = source
+        self.ns = {'ns': self.NS_URI}
+        # Items read so far, for throughput reporting
+        self.records = 0
+
+    def _resolve_tags(self, root):
+        # Namespace is decided once per file from the root element
+        prefix = f"{{{self.NS_URI}}}"
+        if not root.tag.startswith(prefix):
+            # Fallback to no namespace
+            prefix = ""
+            self.ns = None
+
+        self.field_tags = {
+            prefix + 'PartNumber': 'PartNumber',
+            prefix + 'BrandLabel': 'Brand',
+        }
+        self.filename_tag = prefix + 'FileName'
+        self.component_tag = prefix + 'ComponentPartNumber'
+        self.handlers = {
+            prefix + 'Description': self._on_description,
+            prefix + 'MarketCopyContent': self._on_market_copy,
+            prefix + 'ProductAttribute': self._on_attribute,
+            prefix + 'DigitalFileInformation': self._on_digital_file,
+            prefix + 'KitComponent': self._on_kit_component,
+        }
+        return prefix + 'Item'
+
+    # Handlers receive the node and the per-item state dict built in _extract
+
+    def _on_description(self, node, state):
+        # Filter for EN; descriptions without a LanguageCode are the fallback
+        if not node.text:
+            return
+        lang = node.get('LanguageCode')
+        if lang == 'EN':
+            if state['desc'] is None:
+                state['desc'] = node.text
+        elif not lang and state['desc_fallback'] is None:
+            state['desc_fallback'] = node.text
+
+    def _on_market_copy(self, node, state):
+        if node.get('LanguageCode') == 'EN' and node.text:
+            state['features'].append(node.text)
+
+    def _on_attribute(self, node, state):
+        # Filter EN
+        if node.get('LanguageCode') != 'EN':
+            return
+        a_id = node.get('AttributeID')
+        val = node.text
+        if a_id and val:
+            # Clean ID for column name
+            state['attributes'][f"Attribute_{a_id.replace(' ', '_')}"] = val
+
+    def _on_digital_file(self, node, state):
+        f_node = node.find(self.filename_tag)
+        if f_node is not None and f_node.text:
+            state['images'].append(f_node.text)
+
+    def _on_kit_component(self, node, state):
+        c_node = node.find(self.component_tag)
+        if c_node is not None and c_node.text:
+            state['components'].append(c_node.text)
+
+    def _extract(self, item):
+        """Walk an Item once, dispatching every descendant to its handler."""
+        fields = {}
+        state = {
+            'desc': None,
+            'desc_fallback': None,
+            'features': [],
+            'attributes': {},
+            'images': [],
+            'components': [],
+        }
+        field_tags = self.field_tags
+        handlers = self.handlers
+
+        for child in item:
+            # Base fields only count as direct children (PartInterchange nests PartNumber)
+            field = field_tags.get(child.tag)
+            if field is not None and field not in fields:
+                fields[field] = child.text
+            for node in child.iter():
+                handler = handlers.get(node.tag)
+                if handler is not None:
+                    handler(node, state)
+
+        part_data = {
+            'PartNumber': fields.get('PartNumber') or "N/A",
+            'Brand': fields.get('Brand'),
+            'Description': state['desc'] or state['desc_fallback'] or "",
+            'Features': " | ".join(state['features']),
+        }
+        part_data.update(state['attributes'])
+        part_data['Images'] = ";".join(state['images'])
+        part_data[KIT_COLUMN] = ";".join(state['components'])
+        return part_data
+
+    def iter_items(self):
+        """Stream (MaintenanceType, item record) for every Item in the file.
+
+        Items without a MaintenanceType count as adds.
+        """
+        for item in stream_elements(self.source or self.filepath, self._resolve_tags):
+            self.records += 1
+            yield item.get('MaintenanceType') or 'A', self._extract(item)
 
     def parse(self):
+        import pandas as pd
+
+        from pies_frame import PiesFrameBuilder
+
         logging.info(f"Parsing PIES file: {self.filepath}")
+        builder = PiesFrameBuilder()
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            for maintenance_type, record in self.iter_items():
+                # A delete record is not a product; dropping it from the catalog needs a store (--store)
+                if maintenance_type != DELETE_CODE:
+                    builder.add(record)
         except Exception as e:
             logging.error(f"Error parsing {self.filepath}: {e}")
             return pd.DataFrame()
 
-        items = []
-        # Try namespace search
-        pies_items = root.findall('.//ns:Item', self.ns)
-        if not pies_items:
-            # Fallback to no namespace
-            pies_items = root.findall('.//Item')
-            self.ns = None 
-
-        for item in pies_items:
-            part_data = {}
-            ns = self.ns
-            
-            # Helper
-            def get_text(path):
-                n = item.find(path, ns)
-                return n.text if n is not None else None
-            
-            # Base Fields
-            part_data['PartNumber'] = get_text('ns:PartNumber' if ns else 'PartNumber') or "N/A"
-            part_data['Brand'] = get_text('ns:BrandLabel' if ns else 'BrandLabel')
-            
-            # Descriptions - Filter for EN
-            desc_tag = 'ns:Description' if ns else 'Description'
-            descriptions = []
-            for d in item.findall(f'.//{desc_tag}', ns):
-                # Check LanguageCode attribute. namespace might apply to attribute? Usually NO. 
-                # ElementTree attributes don't use namespace generally unless prefixed.
-                lang = d.get('LanguageCode')
-                if lang == 'EN' and d.text:
-                    descriptions.append(d.text)
-            
-            # If no EN found, fallback to any? 
-            # Ideally user wants clean data, so maybe just EN. 
-            if not descriptions:
-                 # Fallback: try finding descriptions without lang attribute or just take first
-                 descriptions = [d.text for d in item.findall(f'.//{desc_tag}', ns) if d.text and not d.get('LanguageCode')]
-
-            part_data['Description'] = descriptions[0] if descriptions else "" 
-
-            # Features - Filter for EN
-            feats = []
-            mkt_tag = 'ns:MarketCopyContent' if ns else 'MarketCopyContent'
-            for mkt in item.findall(f'.//{mkt_tag}', ns):
-                if mkt.get('LanguageCode') == 'EN' and mkt.text:
-                    feats.append(mkt.text)
-            part_data['Features'] = " | ".join(feats)
-
-            # Attributes - FLATTENING & filtering
-            attr_tag = 'ns:ProductAttribute' if ns else 'ProductAttribute'
-            for attr in item.findall(f'.//{attr_tag}', ns):
-                # Filter EN
-                if attr.get('LanguageCode') != 'EN':
-                     continue
-                     
-                a_id = attr.get('AttributeID')
-                val = attr.text
-                if a_id and val:
-                    # Clean ID for column name
-                    clean_id = f"Attribute_{a_id.replace(' ', '_')}"
-                    part_data[clean_id] = val
-                    
-            # Images
-            img_tag = 'ns:DigitalFileInformation' if ns else 'DigitalFileInformation'
-            fname_tag = 'ns:FileName' if ns else 'FileName'
-            images = []
-            for asset in item.findall(f'.//{img_tag}', ns):
-                f_node = asset.find(fname_tag, ns)
-                if f_node is not None and f_node.text:
-                    images.append(f_node.text)
-            part_data['Images'] = ";".join(images)
-            
-            items.append(part_data)
-            
-        return pd.DataFrame(items)
+        return builder.build()
 
 class AcesParser:
-    def __init__(self, filepath):
+    # Bump whenever the parsed output changes, so cached results are invalidated
+    VERSION = 3
+
+    def __init__(self, filepath, source=None, resolver=None):
+        # source: optional open binary stream (e.g. a zip member); filepath is then just a label
+        # resolver: optional vcdb.VcdbResolver to label each App with Year/Make/Model/Submodel
         self.filepath = filepath
+        self.source = source
+        self.resolver = resolver
+        # Apps read so far, for throughput reporting
+        self.records = 0
 
-    def parse(self):
-        logging.info(f"Parsing ACES file: {self.filepath}")
-        try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-        except Exception as e:
-            logging.error(f"Error parsing {self.filepath}: {e}")
-            return pd.DataFrame()
+    def iter_fitments(self):
+        """Stream (PartNumber, BaseVehicle id, SubModel id) for every App in the file.
 
-        mapping = defaultdict(list)
-        
-        for app in root.iter('App'):
+        Each <App> is handled as soon as it closes and then released, so peak
+        memory stays flat regardless of file size.
+        """
+        for app in stream_elements(self.source or self.filepath, lambda root: 'App'):
+            self.records += 1
+            # action="D" withdraws an App, it is not a fitment
+            if app.get('action') == DELETE_CODE:
+                continue
             part = app.find('Part')
             part_num = part.text if part is not None else None
-            
+
             if not part_num:
                 continue
-                
+
             bv = app.find('BaseVehicle')
             bv_id = bv.get('id') if bv is not None else ""
-            
-            # If we had Year/Make model map, we'd apply it here.
-            # Using ID for now as per constraints.
+
+            sm = app.find('SubModel')
+            submodel_id = sm.get('id') if sm is not None else None
+
             if bv_id:
-                mapping[part_num].append(bv_id)
-
-        data = []
-        for p, fits in mapping.items():
-            # Join IDs with comma
-            data.append({
-                'PartNumber': p,
-                'VehicleIDs': ",".join(fits[:100]) # Limit
-            })
-            
-        return pd.DataFrame(data)
-
-def process_directory(work_dir):
+                yield part_num, bv_id, submodel_id
+
+    def iter_apps(self):
+        """Stream (action, PartNumber, BaseVehicle id, SubModel id, qualifiers) for every App.
+
+        qualifiers is the rest of the App (position, notes, qty, ...) as one
+        canonical string, which tells apart Apps of the same part and vehicle.
+        Apps without a part or BaseVehicle are skipped, as in iter_fitments.
+        """
+        for app in stream_elements(self.source or self.filepath, lambda root: 'App'):
+            self.records += 1
+            part_num = bv_id = submodel_id = None
+            qualifiers = []
+            for child in app:
+                if child.tag == 'Part':
+                    part_num = child.text
+                elif child.tag == 'BaseVehicle':
+                    bv_id = child.get('id')
+                elif child.tag == 'SubModel':
+                    submodel_id = child.get('id')
+                else:
+                    attrs = ",".join(f"{k}={v}" for k, v in sorted(child.attrib.items()))
+                    qualifiers.append(f"{child.tag}[{attrs}]{(child.text or '').strip()}")
+
+            if part_num and bv_id:
+                yield app.get('action') or 'A', part_num, bv_id, submodel_id, "|".join(qualifiers)
+
+    def collect(self):
+        """Build the file's fitment indexes as {column: FitmentIndex} (raises on bad XML).
+
+        VehicleIDs is always present; Vehicles (resolved labels) only with a resolver.
+        """
+        from fitment_index import FitmentIndexBuilder
+
+        logging.info(f"Parsing ACES file: {self.filepath}")
+        ids = FitmentIndexBuilder()
+        labels = FitmentIndexBuilder() if self.resolver is not None else None
+        for part_num, bv_id, submodel_id in self.iter_fitments():
+            ids.add(part_num, bv_id)
+            if labels is not None:
+                label = self.resolver.resolve(bv_id, submodel_id)
+                if label:
+                    labels.add(part_num, label)
+
+        result = {'VehicleIDs': ids.build()}
+        if labels is not None:
+            result['Vehicles'] = labels.build()
+        return result
+
+    def parse(self):
+        import pandas as pd
+
+        try:
+            result = self.collect()
+        except Exception as e:
+            logging.error(f"Error parsing {self.filepath}: {e}")
+            return pd.DataFrame()
+        return fitment_frame(result)
+
+# Separator per fitment column when exported
+FITMENT_SEPARATORS = {'VehicleIDs': ",", 'Vehicles': "; ", 'KitVehicleIDs': ",", 'KitVehicles': "; "}
+
+def fitment_frame(result):
+    """Export {column: FitmentIndex} as one PartNumber row per part."""
+    import pandas as pd
+
+    df = None
+    for column, index in result.items():
+        part_df = index.to_frame(column, FITMENT_SEPARATORS[column])
+        # Outer, since a kit can have rolled-up fitment without any of its own
+        df = part_df if df is None else pd.merge(df, part_df, on='PartNumber', how='outer')
+    return df
+
+def merge_pies(all_pies):
+    """Concatenate per-feed PIES frames, keeping the last row per PartNumber."""
+    import pandas as pd
+
+    if not all_pies:
+        return pd.DataFrame(columns=['PartNumber'])
+    logging.info("Concatenating PIES data...")
+    master_df = pd.concat(all_pies, ignore_index=True)
+    # Drop duplicates if any
+    master_df.drop_duplicates(subset=['PartNumber'], keep='last', inplace=True)
+    return master_df
+
+def merge_aces(all_aces, columns=('VehicleIDs',)):
+    """Union per-feed {column: FitmentIndex} results into one index per column."""
+    from fitment_index import FitmentIndex
+
+    if not all_aces:
+        return {}
+    logging.info("Merging ACES fitment indexes...")
+    fitment = {column: FitmentIndex.merge(result[column] for result in all_aces) for column in columns}
+    ids = fitment['VehicleIDs']
+    logging.info(f"Fitment index: {len(ids)} parts, {len(ids.vehicles)} vehicles, {ids.n_fitments} fitments")
+    return fitment
+
+def merge_catalog(master_df, fitment):
+    """Left-join the fitment columns onto the PIES items."""
+    import pandas as pd
+
+    if fitment:
+        # VehicleIDs strings are only built here, at export time
+        fitment_df = fitment_frame(fitment)
+    else:
+        fitment_df = pd.DataFrame(columns=['PartNumber'])
+
+    logging.info("Merging ACES and PIES...")
+    return pd.merge(master_df, fitment_df, on='PartNumber', how='left')
+
+def drop_empty_columns(final_df):
+    """Drop columns without any value, in place; returns how many were dropped."""
+    # PiesFrameBuilder never emits empty cells or columns, but a column can
+    # still end up empty once duplicates are dropped or if no part has fitment
+    empty_cols = [c for c in final_df.columns if not final_df[c].notna().any()]
+    final_df.drop(columns=empty_cols, inplace=True)
+    logging.info(f"Dropped {len(empty_cols)} empty columns.")
+    return len(empty_cols)
+
+def feed_header(path, member=None):
+    """Return the <Header> fields of a feed as {name: text}, without reading past it."""
+    stream = open_zip_member(path, member) if member is not None else open(path, 'rb')
+    try:
+        for event, elem in ET.iterparse(stream, events=('end',)):
+            name = elem.tag.rsplit('}', 1)[-1]
+            if name == 'Header':
+                return {child.tag.rsplit('}', 1)[-1]: (child.text or "").strip() for child in elem}
+            if name in ('App', 'Item'):
+                break
+    finally:
+        stream.close()
+    return {}
+
+def update_store(store, sources):
+    """Apply every feed the store hasn't seen yet, oldest EffectiveDate/TransferDate first.
+
+    Feeds are recognised by content, so renaming or re-dropping a feed does
+    nothing. Returns the number of records applied.
+    """
+    pending = []
+    for label, parser_cls, path, member in sources:
+        digest = content_digest(path, member)
+        if store.has_feed(digest):
+            continue
+        try:
+            stamp = feed_stamp(feed_header(path, member), label)
+        except Exception as e:
+            logging.error(f"Error reading header of {label}: {e}")
+            continue
+        pending.append((stamp, digest, label, parser_cls, path, member))
+
+    latest = store.latest_stamp()
+    applied = 0
+    for stamp, digest, label, parser_cls, path, member in sorted(pending, key=lambda p: p[:2]):
+        if stamp < latest:
+            logging.warning(f"{label} is older than feeds already applied; newer records are kept")
+        stream = open_zip_member(path, member) if member is not None else None
+        try:
+            if parser_cls is PiesParser:
+                parser = PiesParser(label, stream)
+                counts = store.apply_items(digest, label, stamp, parser.iter_items())
+            else:
+                parser = AcesParser(label, stream)
+                counts = store.apply_apps(digest, label, stamp, parser.iter_apps())
+            applied += parser.records
+            logging.info(f"Applied {label}: {counts['upserts']} upserts, {counts['deletes']} deletes")
+        except Exception as e:
+            logging.error(f"Error applying {label}: {e}")
+        finally:
+            if stream is not None:
+                stream.close()
+    return applied
+
+def process_directory(work_dir, workers=1, shard_bytes=32 * 1024 * 1024,
+                      cache_dir=None, cache_max_bytes=2 * 1024 ** 3, rebuild_cache=False,
+                      vcdb=None, sqlite=False, profile=None, store=None, kits=None, text_index=None,
+                      output_dir=None):
+    """Convert every feed under work_dir/Input into the consolidated catalog.
+
+    With workers > 1 the feeds are parsed in a process pool, and loose ACES
+    files bigger than shard_bytes are split into byte ranges of whole <App>
+    elements. Results are merged in input order, so the output is identical
+    to the serial run.
+
+    With cache_dir set, per-feed results are kept in a ParseCache and only
+    new or changed feeds are parsed; rebuild_cache=True reparses everything.
+
+    With vcdb set (a VCdb snapshot folder, see vcdb.py), every App is also
+    resolved to Year/Make/Model/Submodel and exported as a Vehicles column.
+
+    With sqlite=True the items, attributes and full fitment are also loaded
+    into Output/Consolidated_Catalog.db (query it with catalog_db.CatalogDB).
+
+    With store set (a database path), feeds are applied as deltas to a
+    persistent CatalogStore instead: only feeds it hasn't seen are read,
+    MaintenanceType/action "D" records delete, and the catalog is exported
+    from the store, in PartNumber order (workers and the cache are not used).
+
+    With kits='union' or 'intersection', kits are linked to their components
+    (PIES KitComponent segments, or left/right pairs named ...LR -> ...L + ...R)
+    and get KitComponents / KitVehicleIDs columns plus attributes rolled up
+    from the components (see kit_graph.py).
+
+    With text_index set (a folder), a full-text index over the items'
+    descriptions, features and attributes is built there after the export
+    (query it with text_index.TextIndex; new PIES feeds can be added to it
+    incrementally with text_index.index_feed).
+
+    Every run writes Output/run_report.json with wall/CPU time, peak RSS and
+    throughput per stage and per feed. profile='cprofile' or 'tracemalloc'
+    additionally profiles the run (see run_metrics.profiling).
+
+    output_dir overrides where the outputs go (default work_dir/Output), e.g.
+    a staging folder that is published once the run has succeeded.
+    """
     input_dir = os.path.join(work_dir, 'Input')
-    output_dir = os.path.join(work_dir, 'Output')
+    output_dir = output_dir or os.path.join(work_dir, 'Output')
     
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    report = RunReport({
+        'work_dir': work_dir, 'workers': workers, 'shard_bytes': shard_bytes,
+        'cache_dir': cache_dir, 'rebuild_cache': rebuild_cache, 'vcdb': vcdb,
+        'sqlite': sqlite, 'profile': profile, 'store': store, 'kits': kits, 'text_index': text_index,
+    })
+    try:
+        with profiling(profile, output_dir):
+            if store:
+                master_df, fitment = _convert_store(input_dir, report, store, vcdb)
+            else:
+                master_df, fitment = _convert(input_dir, report, workers, shard_bytes,
+                                              cache_dir, cache_max_bytes, rebuild_cache, vcdb)
+            if kits:
+                with report.stage('kits', 'kits') as m:
+                    master_df, fitment, m.records = resolve_kits(master_df, fitment, kits)
+            _export(output_dir, report, master_df, fitment, sqlite)
+            if text_index:
+                from text_index import build_index
+
+                with report.stage('text_index', 'items') as m:
+                    try:
+                        m.records = build_index(master_df, text_index)
+                    except Exception as e:
+                        logging.error(f"Failed to build text index: {e}")
+    finally:
+        try:
+            report.save(os.path.join(output_dir, 'run_report.json'))
+        except Exception as e:
+            logging.error(f"Failed to save run report: {e}")
+
+def _convert_store(input_dir, report, store_path, vcdb):
+    """Bring the store up to date with Input and return its (items, fitment)."""
+    import pandas as pd
+
+    from vcdb import open_vcdb
+
+    with report.stage('scan') as m:
+        logging.info(f"Scanning Input: {input_dir}")
+        sources = list(iter_input_sources(input_dir))
+        m.records = len(sources)
+
+    with CatalogStore(store_path) as store:
+        with report.stage('apply', 'records') as m:
+            m.records = update_store(store, sources)
+        logging.info(f"Catalog store {store_path}: {store.summary()}")
+
+        with report.stage('merge_pies', 'items') as m:
+            master_df = store.items_frame()
+            if master_df.empty:
+                master_df = pd.DataFrame(columns=['PartNumber'])
+            m.records = len(master_df)
+        with report.stage('merge_aces', 'parts') as m:
+            fitment = store.fitment(open_vcdb(vcdb) if vcdb else None)
+            ids = fitment['VehicleIDs']
+            if not len(ids):
+                fitment = {}
+            logging.info(f"Fitment index: {len(ids)} parts, {len(ids.vehicles)} vehicles, {ids.n_fitments} fitments")
+            m.records = len(ids)
+    return master_df, fitment
+
+def _convert(input_dir, report, workers, shard_bytes,
+             cache_dir, cache_max_bytes, rebuild_cache, vcdb):
+    from fitment_index import FitmentIndex
+    from vcdb import open_vcdb
+
     all_pies = []
     all_aces = []
     
-    logging.info(f"Scanning Input: {input_dir}")
-    for root_dir, dirs, files in os.walk(input_dir):
-        for f in files:
-            if f.lower().endswith('.xml'):
-                full_path = os.path.join(root_dir, f)
-                if 'pies' in f.lower():
-                    df = PiesParser(full_path).parse()
-                    if not df.empty:
-                        all_pies.append(df)
-                elif 'aces' in f.lower():
-                    df = AcesParser(full_path).parse()
-                    if not df.empty:
-                        all_aces.append(df)
-
-    # Merge PIES
-    if all_pies:
-        logging.info("Concatenating PIES data...")
-        master_df = pd.concat(all_pies, ignore_index=True)
-        # Drop duplicates if any
-        master_df.drop_duplicates(subset=['PartNumber'], keep='last', inplace=True)
-    else:
-        master_df = pd.DataFrame(columns=['PartNumber'])
-
-    # Merge ACES
-    if all_aces:
-        logging.info("Concatenating ACES data...")
-        fitment_df = pd.concat(all_aces, ignore_index=True)
-        # Aggregate logic: Group by part and join strings (if multiple rows per part)
-        fitment_df = fitment_df.groupby('PartNumber')['VehicleIDs'].apply(lambda x: ",".join(x)).reset_index()
-    else:
-        fitment_df = pd.DataFrame(columns=['PartNumber'])
+    with report.stage('scan') as m:
+        logging.info(f"Scanning Input: {input_dir}")
+        sources = list(iter_input_sources(input_dir))
+        m.records = len(sources)
+    per_source = [[] for _ in sources]
+    file_stats = [[] for _ in sources]
 
-    # Final Merge
-    logging.info("Merging ACES and PIES...")
-    final_df = pd.merge(master_df, fitment_df, on='PartNumber', how='left')
-    
-    # Cleaning: Drop columns where all values are NaN or empty strings
-    # Convert empty strings to NaN first
-    final_df.replace("", float("nan"), inplace=True)
-    before_cols = len(final_df.columns)
-    final_df.dropna(axis=1, how='all', inplace=True)
-    after_cols = len(final_df.columns)
-    logging.info(f"Dropped {before_cols - after_cols} empty columns.")
+    cache = ParseCache(cache_dir, cache_max_bytes, rebuild_cache) if cache_dir else None
+    cache_keys = {}
+
+    # Cache key suffix per ACES column; labels depend on the VCdb snapshot too
+    aces_columns = {'VehicleIDs': 'VehicleIDs'}
+    if vcdb:
+        aces_columns['Vehicles'] = f"Vehicles-{open_vcdb(vcdb).digest}"
+
+    # One task per file, or per byte range when a large ACES file is sharded
+    tasks = []
+    task_owner = []
+    with report.stage('plan') as m:
+        for idx, (label, parser_cls, path, member) in enumerate(sources):
+            if cache is not None:
+                key = cache.key(parser_cls, path, member)
+                if parser_cls is AcesParser:
+                    frames = {column: cache.load(f"{key}-{suffix}") for column, suffix in aces_columns.items()}
+                    cached = None
+                    if all(frame is not None for frame in frames.values()):
+                        cached = {column: FitmentIndex.from_long_frame(frame) for column, frame in frames.items()}
+                else:
+                    cached = cache.load(key)
+                if cached is not None:
+                    logging.info(f"Using cached result for {label}")
+                    per_source[idx].append(cached)
+                    continue
+                cache_keys[idx] = key
+
+            split = None
+            if workers > 1 and parser_cls is AcesParser and member is None:
+                split = split_aces_ranges(path, shard_bytes)
+            if split is None:
+                tasks.append((parser_cls, label, path, member, None, vcdb))
+                task_owner.append(idx)
+            else:
+                head, tail, ranges = split
+                for start, end in ranges:
+                    tasks.append((parser_cls, label, path, None, (head, tail, start, end), vcdb))
+                    task_owner.append(idx)
+        m.records = len(tasks)
+
+    with report.stage('parse') as m:
+        if workers > 1 and len(tasks) > 1:
+            logging.info(f"Parsing {len(tasks)} tasks on {workers} workers...")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_parse_task, tasks))
+        else:
+            results = [_parse_task(task) for task in tasks]
+        m.records = len(tasks)
+
+    # Regroup shard results per source, in input order
+    for idx, (result, stats) in zip(task_owner, results):
+        per_source[idx].append(result)
+        file_stats[idx].append(stats)
+
+    for idx, (label, parser_cls, path, member) in enumerate(sources):
+        report.add_file(label, parser_cls.__name__, _file_summary(file_stats[idx]))
+    worker_peaks = {}
+    for _, stats in results:
+        peak = stats['worker_peak_rss_mb']
+        if peak is not None:
+            worker_peaks[stats['worker']] = max(peak, worker_peaks.get(stats['worker'], peak))
+    for pid, peak in sorted(worker_peaks.items()):
+        report.add_worker(pid, peak)
+
+    with report.stage('collect') as m:
+        for idx, shards in enumerate(per_source):
+            parser_cls = sources[idx][1]
+            if any(shard is None for shard in shards):
+                # A failed shard invalidates the whole file, as in the serial parser
+                continue
+            key = cache_keys.get(idx)
+            if parser_cls is PiesParser:
+                df = shards[0]
+                if key is not None:
+                    cache.store(key, df)
+                if not df.empty:
+                    all_pies.append(df)
+            else:
+                result = {column: FitmentIndex.merge(shard[column] for shard in shards) for column in shards[0]}
+                if key is not None:
+                    for column, index in result.items():
+                        cache.store(f"{key}-{aces_columns[column]}", index.to_long_frame())
+                if len(result['VehicleIDs']):
+                    all_aces.append(result)
+
+        if cache is not None:
+            cache.evict()
+        m.records = len(all_pies) + len(all_aces)
+
+    with report.stage('merge_pies', 'items') as m:
+        master_df = merge_pies(all_pies)
+        m.records = len(master_df)
+    with report.stage('merge_aces', 'parts') as m:
+        fitment = merge_aces(all_aces, aces_columns)
+        m.records = len(fitment['VehicleIDs']) if fitment else 0
+    return master_df, fitment
+
+def _export(output_dir, report, master_df, fitment, sqlite):
+    if sqlite:
+        from catalog_db import write_catalog_db
+
+        db_path = os.path.join(output_dir, 'Consolidated_Catalog.db')
+        with report.stage('sqlite'):
+            try:
+                write_catalog_db(db_path, master_df, fitment)
+            except Exception as e:
+                logging.error(f"Failed to save SQLite catalog: {e}")
+
+    with report.stage('merge_catalog', 'rows') as m:
+        final_df = merge_catalog(master_df, fitment)
+        m.records = len(final_df)
+    with report.stage('drop_empty_columns'):
+        drop_empty_columns(final_df)
     
-    # Save CSV
+    # Save CSV and Excel in one pass; the workbook is split across sheets/files past Excel's row limit
     csv_path = os.path.join(output_dir, 'Consolidated_Catalog.csv')
-    try:
-        final_df.to_csv(csv_path, index=False)
-        logging.info(f"Saved CSV to {csv_path}")
-    except Exception as e:
-        logging.error(f"Failed to save CSV: {e}")
-
-    # Optional: Save Excel too if manageable
     xlsx_path = os.path.join(output_dir, 'Consolidated_Catalog.xlsx')
-    try:
-        # Excel has row/col limits. If columns > 16384 (unlikely with just attributes) it fails.
-        # But if sparse attributes create thousands of columns? 
-        # PIES attributes are usually standard.
-        final_df.to_excel(xlsx_path, index=False)
-        logging.info(f"Saved Excel to {xlsx_path}")
-    except Exception as e:
-        logging.error(f"Failed to save Excel: {e}")
+    with report.stage('export', 'rows') as m:
+        try:
+            xlsx_paths = export_catalog(final_df, csv_path, xlsx_path)
+            m.records = len(final_df)
+            logging.info(f"Saved CSV to {csv_path}")
+            for path in xlsx_paths:
+                logging.info(f"Saved Excel to {path}")
+        except Exception as e:
+            logging.error(f"Failed to save CSV: {e}")
+
+def _file_summary(task_stats):
+    """Fold the per-task metrics of one feed (several when sharded) into one entry."""
+    if not task_stats:
+        return {'cached': True}
+    summary = {
+        'cached': False,
+        'tasks': len(task_stats),
+        'wall_s': round(sum(s['wall_s'] for s in task_stats), 3),
+        'cpu_s': round(sum(s['cpu_s'] for s in task_stats), 3),
+        'workers': sorted({s['worker'] for s in task_stats}),
+    }
+    units = [k[:-len('_per_s')] for s in task_stats for k in s if k.endswith('_per_s')]
+    if units:
+        records = sum(s.get('records', 0) for s in task_stats)
+        summary['records'] = records
+        # wall_s is summed over shards, so this is the rate per worker
+        summary[f'{units[0]}_per_s'] = round(records / summary['wall_s']) if summary['wall_s'] else None
+    return summary
+
+def main(argv=None):
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Convert ACES/PIES feeds into the consolidated catalog.")
+    arg_parser.add_argument('work_dir', nargs='?', default=PROJECT_DIR, help="Project folder holding Input/ and Output/")
+    arg_parser.add_argument('--workers', type=int, default=1, help="Parse feeds in a process pool of this size")
+    arg_parser.add_argument('--cache-dir', help="Parse cache folder (default: <work_dir>/Processing/parse_cache)")
+    arg_parser.add_argument('--cache-max-mb', type=int, default=2048, help="Evict cached results beyond this size")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Parse every feed without touching the cache")
+    arg_parser.add_argument('--rebuild-cache', action='store_true', help="Reparse every feed and overwrite its cache entry")
+    arg_parser.add_argument('--vcdb', help="VCdb snapshot folder for Year/Make/Model/Submodel labels")
+    arg_parser.add_argument('--sqlite', action='store_true', help="Also write the indexed Consolidated_Catalog.db")
+    arg_parser.add_argument('--store', nargs='?', const='',
+                            help="Apply feeds as deltas to a persistent catalog store "
+                                 "(default: <work_dir>/Processing/catalog_store.db)")
+    arg_parser.add_argument('--kits', choices=['union', 'intersection'],
+                            help="Roll component fitment/attributes up to kits (KitVehicleIDs column)")
+    arg_parser.add_argument('--text-index', nargs='?', const='',
+                            help="Build the full-text search index (default: <work_dir>/Output/text_index)")
+    arg_parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'],
+                            help="Profile the run; cprofile also writes Output/convert_profile.prof")
+    args = arg_parser.parse_args(argv)
+
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(args.work_dir, 'Processing', 'parse_cache')
+
+    store = args.store
+    if store == '':
+        store = os.path.join(args.work_dir, 'Processing', 'catalog_store.db')
+
+    process_directory(args.work_dir, workers=args.workers, cache_dir=cache_dir,
+                      cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                      rebuild_cache=args.rebuild_cache, vcdb=args.vcdb, sqlite=args.sqlite,
+                      profile=args.profile, store=store, kits=args.kits,
+                      text_index=os.path.join(args.work_dir, 'Output', 'text_index') if args.text_index == ''
+                      else args.text_index)
 
 if __name__ == "__main__":
-    WORK_DIR = r"d:\UpWork\04_Aces_Pies_Data" 
-    process_directory(WORK_DIR)
+    main()
@@ -0,0 +1,166 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+def _canonical(values, codes, key):
+    """Sort interned values and remap their codes to match."""
+    order = sorted(range(len(values)), key=lambda i: values[i] if key is None else key(values[i]))
+    rank = np.empty(len(values), dtype=np.int32)
+    rank[order] = np.arange(len(values), dtype=np.int32)
+    return [values[i] for i in order], rank[codes] if len(codes) else codes
+
+def _vehicle_key(v):
+    # Numeric order for BaseVehicle ids, plain text order for anything else (e.g. VCdb labels)
+    if v.isdigit():
+        return (0, len(v), v)
+    return (1, 0, v)
+
+class FitmentIndexBuilder:
+    """Accumulates (PartNumber, BaseVehicle id) pairs as interned integer codes."""
+
+    def __init__(self):
+        self.part_codes = {}
+        self.vehicle_codes = {}
+        self._parts = array('i')
+        self._vehicles = array('i')
+
+    def add(self, part_num, bv_id):
+        part_code = self.part_codes.get(part_num)
+        if part_code is None:
+            part_code = self.part_codes[part_num] = len(self.part_codes)
+        vehicle_code = self.vehicle_codes.get(bv_id)
+        if vehicle_code is None:
+            vehicle_code = self.vehicle_codes[bv_id] = len(self.vehicle_codes)
+        self._parts.append(part_code)
+        self._vehicles.append(vehicle_code)
+
+    def build(self):
+        return FitmentIndex.from_codes(
+            list(self.part_codes),
+            list(self.vehicle_codes),
+            np.frombuffer(self._parts, dtype=np.int32),
+            np.frombuffer(self._vehicles, dtype=np.int32),
+        )
+
+class FitmentIndex:
+    """Deduplicated part -> vehicle fitment in CSR form.
+
+    Part numbers and BaseVehicle ids are interned to integer codes in sorted
+    order (BaseVehicle ids numerically), so the index never depends on file order.
+    "Vehicles" can also be resolved labels such as "2004 BMW 325i".
+    Row i of the CSR (indices[indptr[i]:indptr[i + 1]]) holds the sorted
+    vehicle codes of part i. The vehicle -> parts transpose is built
+    lazily on first lookup. Comma-joined strings are only produced by to_frame().
+    """
+
+    def __init__(self, parts, vehicles, indptr, indices):
+        self.parts = parts
+        self.vehicles = vehicles
+        self.indptr = indptr
+        self.indices = indices
+        self._part_lookup = None
+        self._vehicle_lookup = None
+        self._transpose = None
+
+    @classmethod
+    def from_codes(cls, parts, vehicles, part_codes, vehicle_codes):
+        """Build from parallel code arrays; codes are re-ranked and duplicate pairs dropped."""
+        parts, part_codes = _canonical(parts, part_codes, key=None)
+        vehicles, vehicle_codes = _canonical(vehicles, vehicle_codes, key=_vehicle_key)
+
+        n_vehicles = max(len(vehicles), 1)
+        pairs = np.unique(part_codes.astype(np.int64) * n_vehicles + vehicle_codes)
+        rows = pairs // n_vehicles
+        indices = (pairs % n_vehicles).astype(np.int32)
+        indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(parts)), out=indptr[1:])
+        return cls(parts, np.asarray(vehicles, dtype=object), indptr, indices)
+
+    @classmethod
+    def empty(cls):
+        return FitmentIndexBuilder().build()
+
+    @classmethod
+    def merge(cls, indexes):
+        """Union several indexes (e.g. shards of one file, or every ACES feed)."""
+        indexes = list(indexes)
+        if len(indexes) == 1:
+            return indexes[0]
+
+        part_codes = {}
+        vehicle_codes = {}
+        all_parts = []
+        all_vehicles = []
+        for index in indexes:
+            part_map = np.array([part_codes.setdefault(p, len(part_codes)) for p in index.parts], dtype=np.int32)
+            vehicle_map = np.array([vehicle_codes.setdefault(v, len(vehicle_codes)) for v in index.vehicles], dtype=np.int32)
+            rows = np.repeat(np.arange(len(index.parts), dtype=np.int32), np.diff(index.indptr))
+            all_parts.append(part_map[rows] if len(rows) else rows)
+            all_vehicles.append(vehicle_map[index.indices] if len(index.indices) else index.indices)
+
+        return cls.from_codes(
+            list(part_codes),
+            list(vehicle_codes),
+            np.concatenate(all_parts),
+            np.concatenate(all_vehicles),
+        )
+
+    def __len__(self):
+        return len(self.parts)
+
+    @property
+    def n_fitments(self):
+        return len(self.indices)
+
+    def vehicles_for(self, part_num):
+        """BaseVehicle ids the part fits (empty list if unknown)."""
+        if self._part_lookup is None:
+            self._part_lookup = {p: i for i, p in enumerate(self.parts)}
+        i = self._part_lookup.get(part_num)
+        if i is None:
+            return []
+        return list(self.vehicles[self.indices[self.indptr[i]:self.indptr[i + 1]]])
+
+    def parts_for(self, bv_id):
+        """Part numbers that fit the BaseVehicle id (empty list if unknown)."""
+        if self._vehicle_lookup is None:
+            self._vehicle_lookup = {v: i for i, v in enumerate(self.vehicles)}
+        j = self._vehicle_lookup.get(bv_id)
+        if j is None:
+            return []
+        if self._transpose is None:
+            rows = np.repeat(np.arange(len(self.parts), dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind='stable')
+            t_indptr = np.zeros(len(self.vehicles) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=len(self.vehicles)), out=t_indptr[1:])
+            self._transpose = (t_indptr, rows[order])
+        t_indptr, t_indices = self._transpose
+        return [self.parts[i] for i in t_indices[t_indptr[j]:t_indptr[j + 1]]]
+
+    def to_frame(self, column='VehicleIDs', sep=","):
+        """PartNumber / joined vehicles, one row per part (no truncation)."""
+        vehicles = self.vehicles
+        indptr = self.indptr
+        indices = self.indices
+        joined = [sep.join(vehicles[indices[indptr[i]:indptr[i + 1]]]) for i in range(len(self.parts))]
+        return pd.DataFrame({'PartNumber': self.parts, column: joined})
+
+    def to_long_frame(self):
+        """One PartNumber/VehicleID row per fitment, for columnar storage."""
+        rows = np.repeat(np.arange(len(self.parts)), np.diff(self.indptr))
+        return pd.DataFrame({
+            'PartNumber': pd.Categorical.from_codes(rows, categories=self.parts),
+            'VehicleID': pd.Categorical.from_codes(self.indices, categories=list(self.vehicles)),
+        })
+
+    @classmethod
+    def from_long_frame(cls, df):
+        part_codes, parts = pd.factorize(df['PartNumber'], sort=False)
+        vehicle_codes, vehicles = pd.factorize(df['VehicleID'], sort=False)
+        return cls.from_codes(
+            list(parts),
+            list(vehicles),
+            part_codes.astype(np.int32),
+            vehicle_codes.astype(np.int32),
+        )
@@ -0,0 +1,208 @@
+import functools
+import logging
+
+# ';'-separated component part numbers, from PIES KitComponent segments or inferred
+KIT_COLUMN = 'KitComponents'
+# Rolled-up column written for each fitment column
+KIT_FITMENT_COLUMNS = {'VehicleIDs': 'KitVehicleIDs', 'Vehicles': 'KitVehicles'}
+MODES = ('union', 'intersection')
+ATTRIBUTE_PREFIX = 'Attribute_'
+# Separator of distinct component values in a union-rolled attribute (as in Features)
+VALUE_SEPARATOR = " | "
+
+def side_pair_components(part_num, known):
+    """Components of a left/right pair kit named after them, e.g. BM025-U000LR -> BM025-U000L, BM025-U000R.
+
+    Both sides have to be known parts; returns [] otherwise.
+    """
+    pos = part_num.rfind('LR')
+    while pos >= 0:
+        left = part_num[:pos] + 'L' + part_num[pos + 2:]
+        right = part_num[:pos] + 'R' + part_num[pos + 2:]
+        if left in known and right in known:
+            return [left, right]
+        pos = part_num.rfind('LR', 0, pos)
+    return []
+
+class KitGraph:
+    """Kit -> component edges, resolved bottom-up with every node computed once.
+
+    Components may be kits themselves; rollup() walks the graph with an
+    explicit stack and memoizes each node's value, so the work is linear in
+    the size of the graph and nesting depth isn't bounded by the recursion
+    limit.
+    """
+
+    def __init__(self, components):
+        # {kit part number: [component part numbers]}
+        self.components = components
+
+    @classmethod
+    def build(cls, items_df, known):
+        """Kits from the PIES KitComponents column, else inferred from side-pair part numbers."""
+        explicit = {}
+        if KIT_COLUMN in items_df.columns:
+            for part_num, value in zip(items_df['PartNumber'], items_df[KIT_COLUMN]):
+                if isinstance(value, str) and value:
+                    explicit[part_num] = [c for c in value.split(";") if c and c != part_num]
+
+        components = {}
+        for part_num in sorted(known):
+            found = explicit.get(part_num) or side_pair_components(part_num, known)
+            if found:
+                components[part_num] = found
+        return cls(components)
+
+    def __len__(self):
+        return len(self.components)
+
+    def rollup(self, leaf_value, combine):
+        """Return {kit: value} for every kit.
+
+        leaf_value(part) is the value of a part that isn't a kit;
+        combine(kit, component_values) merges a kit's components.
+        """
+        memo = {}
+        # Leaf values of kits met again while they were being resolved (cycles)
+        cut = {}
+        for kit in self.components:
+            if kit in memo:
+                continue
+            if not self.components[kit]:
+                memo[kit] = leaf_value(kit)
+                continue
+            # Post-order walk: (node, components not yet visited, component values so far)
+            stack = [(kit, iter(self.components[kit]), [])]
+            active = {kit}
+            while stack:
+                node, pending, values = stack[-1]
+                for part in pending:
+                    if part in memo:
+                        values.append(memo[part])
+                    elif not self.components.get(part):
+                        memo[part] = leaf_value(part)
+                        values.append(memo[part])
+                    elif part in active:
+                        # A kit that (indirectly) contains itself: stop and use its own value
+                        if part not in cut:
+                            logging.warning(f"Kit cycle through {part}")
+                            cut[part] = leaf_value(part)
+                        values.append(cut[part])
+                    else:
+                        active.add(part)
+                        stack.append((part, iter(self.components[part]), []))
+                        break
+                else:
+                    stack.pop()
+                    active.discard(node)
+                    memo[node] = combine(node, values)
+                    if stack:
+                        stack[-1][2].append(memo[node])
+
+        return {kit: memo[kit] for kit in self.components}
+
+def rollup_fitment(graph, index, mode='union'):
+    """FitmentIndex of every kit's rolled-up vehicles (union or intersection of its components')."""
+    import numpy as np
+
+    from fitment_index import FitmentIndex
+
+    lookup = {p: i for i, p in enumerate(index.parts)}
+    empty = np.empty(0, dtype=np.int32)
+
+    def leaf_value(part_num):
+        i = lookup.get(part_num)
+        if i is None:
+            return empty
+        return index.indices[index.indptr[i]:index.indptr[i + 1]]
+
+    if mode == 'union':
+        combine = lambda kit, rows: np.unique(np.concatenate(rows))
+    else:
+        combine = lambda kit, rows: functools.reduce(np.intersect1d, rows)
+
+    rolled = graph.rollup(leaf_value, combine)
+    kits = [kit for kit, row in rolled.items() if len(row)]
+    part_codes = np.repeat(np.arange(len(kits), dtype=np.int32), [len(rolled[kit]) for kit in kits])
+    vehicle_codes = np.concatenate([rolled[kit] for kit in kits]) if kits else empty
+    return FitmentIndex.from_codes(kits, list(index.vehicles), part_codes, vehicle_codes.astype(np.int32))
+
+def rollup_attributes(graph, items_df, mode='union'):
+    """Fill kits' missing Attribute_* cells from their components, in place; returns cells filled.
+
+    A kit's own values always win. union joins the distinct component values,
+    intersection only takes a value all components agree on.
+    """
+    columns = [c for c in items_df.columns if c.startswith(ATTRIBUTE_PREFIX)]
+    rows = {p: i for i, p in enumerate(items_df['PartNumber'])}
+    values = {c: items_df[c].astype(object).where(items_df[c].notna(), None).tolist() for c in columns}
+
+    def own(part_num):
+        i = rows.get(part_num)
+        if i is None:
+            return {}
+        return {c: values[c][i] for c in columns if values[c][i] is not None}
+
+    def combine(kit, parts):
+        merged = {}
+        if mode == 'union':
+            for attrs in parts:
+                for column, value in attrs.items():
+                    merged.setdefault(column, {}).update(dict.fromkeys(value.split(VALUE_SEPARATOR)))
+            merged = {column: VALUE_SEPARATOR.join(found) for column, found in merged.items()}
+        else:
+            shared = set.intersection(*(set(attrs.items()) for attrs in parts)) if parts else set()
+            merged = dict(shared)
+        merged.update(own(kit))
+        return merged
+
+    filled = {}
+    for kit, attrs in graph.rollup(own, combine).items():
+        i = rows.get(kit)
+        if i is None:
+            continue
+        for column, value in attrs.items():
+            if values[column][i] is None:
+                filled.setdefault(column, {})[i] = value
+
+    for column, cells in filled.items():
+        col = items_df[column].astype(object)
+        col.iloc[list(cells)] = list(cells.values())
+        items_df[column] = col
+    return sum(len(cells) for cells in filled.values())
+
+def resolve_kits(items_df, fitment, mode='union'):
+    """Link kits to their components and add the rolled-up kit columns.
+
+    Returns (items_df, fitment, number of kits): items get a KitComponents
+    column and their missing attributes filled from the components, and
+    fitment gets a KitVehicleIDs (and KitVehicles) index per fitment column.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown kit rollup mode {mode!r}, expected one of {MODES}")
+
+    known = set(items_df['PartNumber']) if 'PartNumber' in items_df.columns else set()
+    for index in fitment.values():
+        known.update(index.parts)
+    graph = KitGraph.build(items_df, known)
+    logging.info(f"Resolved {len(graph)} kits ({mode} of component fitment)")
+    if not len(graph):
+        return items_df, fitment, 0
+
+    import pandas as pd
+
+    items_df = items_df.copy()
+    components = pd.Series({kit: ";".join(found) for kit, found in graph.components.items()})
+    kit_column = items_df['PartNumber'].map(components)
+    if KIT_COLUMN in items_df.columns:
+        kit_column = items_df[KIT_COLUMN].astype(object).where(items_df[KIT_COLUMN].notna(), kit_column)
+    items_df[KIT_COLUMN] = kit_column
+
+    filled = rollup_attributes(graph, items_df, mode)
+    logging.info(f"Filled {filled} kit attribute cells from components")
+
+    fitment = dict(fitment)
+    for column, kit_column_name in KIT_FITMENT_COLUMNS.items():
+        if column in fitment:
+            fitment[kit_column_name] = rollup_fitment(graph, fitment[column], mode)
+    return items_df, fitment, len(graph)
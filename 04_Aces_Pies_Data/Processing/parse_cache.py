@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import os
+import pickle
+import zipfile
+
+def _has_parquet():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _hash_stream(fh):
+    h = hashlib.blake2b(digest_size=20)
+    for chunk in iter(lambda: fh.read(1 << 20), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+def content_digest(path, member=None):
+    """Hash the content of a feed, a loose file or a zip member.
+
+    Zip members are inflated and hashed like loose files, so a feed has the
+    same digest whether it is dropped on its own or inside an archive.
+    """
+    if member is not None:
+        with zipfile.ZipFile(path) as zf, zf.open(member) as fh:
+            return _hash_stream(fh)
+    with open(path, 'rb') as fh:
+        return _hash_stream(fh)
+
+class ParseCache:
+    """On-disk cache of per-feed parse results, one columnar file per feed.
+
+    Entries are keyed on content hash + parser name + parser version, so an
+    unchanged feed is never reparsed and a parser change invalidates its own
+    entries only. Parquet is used when pyarrow is installed, pickle otherwise.
+    Least recently used entries are evicted once the cache grows past
+    max_bytes. rebuild=True ignores existing entries (they get overwritten).
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3, rebuild=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.rebuild = rebuild
+        self.ext = '.parquet' if _has_parquet() else '.pkl'
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, parser_cls, path, member=None):
+        return f"{parser_cls.__name__}-v{parser_cls.VERSION}-{content_digest(path, member)}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.ext)
+
+    def load(self, key):
+        """Return the cached DataFrame for key, or None on a miss."""
+        if self.rebuild:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            if self.ext == '.parquet':
+                import pandas as pd
+
+                df = pd.read_parquet(path)
+            else:
+                with open(path, 'rb') as fh:
+                    df = pickle.load(fh)
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            os.remove(path)
+            return None
+        # Touch so eviction sees it as recently used
+        os.utime(path)
+        return df
+
+    def store(self, key, df):
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        try:
+            if self.ext == '.parquet':
+                df.to_parquet(tmp_path, index=False)
+            else:
+                with open(tmp_path, 'wb') as fh:
+                    pickle.dump(df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"Could not cache {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.ext):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            logging.info(f"Evicted cache entry {os.path.basename(path)}")
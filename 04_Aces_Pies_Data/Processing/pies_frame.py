@@ -0,0 +1,65 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+class PiesFrameBuilder:
+    """Column-wise DataFrame builder for parsed PIES items.
+
+    Every column (base fields and each Attribute_<id>) is registered the first
+    time it shows up and keeps its own buffer of (row, value) pairs, so only
+    non-empty cells are stored while parsing. build() never emits a column
+    without values, turns low-cardinality columns (Prop 65 text, lens colour,
+    ...) into Categoricals and leaves missing cells as NaN, so no replace or
+    dropna pass is needed afterwards.
+    """
+
+    # Schema order: identity/content first, attributes as registered, media last
+    LEADING_COLUMNS = ['PartNumber', 'Brand', 'Description', 'Features']
+    TRAILING_COLUMNS = ['Images']
+
+    def __init__(self, categorical_ratio=0.5):
+        # A column becomes categorical when distinct values <= ratio * filled cells
+        self.categorical_ratio = categorical_ratio
+        self.n_rows = 0
+        self.columns = {}
+
+    def add(self, record):
+        row = self.n_rows
+        for name, value in record.items():
+            if value is None or value == "":
+                continue
+            buf = self.columns.get(name)
+            if buf is None:
+                buf = self.columns[name] = (array('i'), [])
+            buf[0].append(row)
+            buf[1].append(value)
+        self.n_rows += 1
+
+    def column_order(self):
+        fixed = set(self.LEADING_COLUMNS) | set(self.TRAILING_COLUMNS)
+        order = [c for c in self.LEADING_COLUMNS if c in self.columns]
+        order += [c for c in self.columns if c not in fixed]
+        order += [c for c in self.TRAILING_COLUMNS if c in self.columns]
+        return order
+
+    def _column(self, rows, values):
+        n = self.n_rows
+        categories = list(dict.fromkeys(values))
+        if len(categories) <= self.categorical_ratio * len(values):
+            lookup = {v: i for i, v in enumerate(categories)}
+            codes = np.full(n, -1, dtype=np.int32)
+            codes[np.frombuffer(rows, dtype=np.int32)] = [lookup[v] for v in values]
+            return pd.Categorical.from_codes(codes, categories=categories)
+
+        if len(values) == n:
+            return values
+        col = np.full(n, np.nan, dtype=object)
+        col[np.frombuffer(rows, dtype=np.int32)] = values
+        return col
+
+    def build(self):
+        if not self.n_rows:
+            return pd.DataFrame()
+        data = {name: self._column(*self.columns[name]) for name in self.column_order()}
+        return pd.DataFrame(data)
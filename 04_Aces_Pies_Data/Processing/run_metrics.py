@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far in MB, or None if unknown."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB everywhere else
+        return round(peak / 1024 / 1024 if platform.system() == 'Darwin' else peak / 1024, 1)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return round(getattr(info, 'peak_wset', info.rss) / 1024 / 1024, 1)
+
+class Measurement:
+    """Wall time, CPU time and peak RSS of one block of work, plus a record count."""
+
+    def __init__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self.records = None
+        self.unit = None
+        self.stats = {}
+        if tracemalloc.is_tracing():
+            # Under --profile tracemalloc each block also gets its own Python heap peak
+            tracemalloc.reset_peak()
+
+    def finish(self):
+        wall = time.perf_counter() - self._wall
+        self.stats.update({
+            'wall_s': round(wall, 3),
+            'cpu_s': round(time.process_time() - self._cpu, 3),
+            'peak_rss_mb': peak_rss_mb(),
+        })
+        if tracemalloc.is_tracing():
+            self.stats['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        if self.records is not None:
+            self.stats['records'] = self.records
+            if self.unit:
+                self.stats[f'{self.unit}_per_s'] = round(self.records / wall) if wall else None
+        return self.stats
+
+@contextmanager
+def measure(unit=None):
+    """Time the with-block; set .records on the yielded Measurement to count work.
+
+    With a unit ('items', 'apps', ...) the stats also get <unit>_per_s.
+    """
+    m = Measurement()
+    m.unit = unit
+    try:
+        yield m
+    finally:
+        m.finish()
+
+class RunReport:
+    """Per-stage and per-file metrics of one process_directory run, saved as JSON.
+
+    Stages are timed in this process. File entries come from parse workers
+    (see convert_data._parse_task), so their CPU time is the worker's own
+    and they list the workers (by pid) that parsed them. A worker's RSS
+    high-water mark covers every file it parsed, so it is reported once per
+    worker, as worker_peak_rss_mb, rather than per file. A stage's
+    peak_rss_mb is the process high-water mark at the end of the stage, so
+    the stage where it jumps is the one that allocated.
+    """
+
+    def __init__(self, options=None):
+        self.started = datetime.now()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self.options = options or {}
+        self.stages = []
+        self.files = []
+        self.workers = []
+
+    @contextmanager
+    def stage(self, name, unit=None):
+        with measure(unit) as m:
+            yield m
+        self.stages.append(dict(stage=name, **m.stats))
+        logging.info(f"Stage {name}: {m.stats['wall_s']}s wall, {m.stats['cpu_s']}s CPU"
+                     + (f", {m.records} {unit or 'records'}" if m.records is not None else ""))
+
+    def add_file(self, label, parser, stats):
+        self.files.append(dict(file=label, parser=parser, **stats))
+
+    def add_worker(self, pid, peak_rss):
+        self.workers.append({'pid': pid, 'worker_peak_rss_mb': peak_rss})
+
+    def as_dict(self):
+        children_cpu = None
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            children_cpu = round(usage.ru_utime + usage.ru_stime, 3)
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': self.options,
+            'total': {
+                'wall_s': round(time.perf_counter() - self._wall, 3),
+                'cpu_s': round(time.process_time() - self._cpu, 3),
+                'workers_cpu_s': children_cpu,
+                'peak_rss_mb': peak_rss_mb(),
+            },
+            'stages': self.stages,
+            'files': self.files,
+            'workers': self.workers,
+        }
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.as_dict(), fh, indent=2, default=str)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved run report to {path}")
+
+@contextmanager
+def profiling(mode, output_dir, top=25):
+    """Optional profiler around a run: mode is None, 'cprofile' or 'tracemalloc'.
+
+    cprofile dumps Output/convert_profile.prof (open with pstats or snakeviz)
+    and logs the top functions by cumulative time; tracemalloc logs the top
+    allocation sites and adds a traced_peak_mb per stage. Both only see this process, so run with --workers 1 to
+    profile the parsers themselves.
+    """
+    if not mode:
+        yield
+        return
+
+    if mode == 'cprofile':
+        import cProfile
+        import io
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            prof_path = os.path.join(output_dir, 'convert_profile.prof')
+            profiler.dump_stats(prof_path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+            logging.info(f"Saved profile to {prof_path}\n{out.getvalue()}")
+    elif mode == 'tracemalloc':
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            lines = [f"tracemalloc peak {peak / 1024 / 1024:.1f} MB; top allocations still held:"]
+            for stat in snapshot.statistics('lineno')[:top]:
+                lines.append(f"  {stat}")
+            logging.info("\n".join(lines))
+    else:
+        raise ValueError(f"Unknown profiler: {mode}")
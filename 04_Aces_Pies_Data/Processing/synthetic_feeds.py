@@ -0,0 +1,134 @@
+"""Deterministic synthetic PIES 7.2 / ACES 4.2 feeds for benchmarking convert_data.
+
+The layout follows the vendor drops in Input/ (one <Item>/<App> per line,
+Header/Trailer blocks, PartInterchange, Prop 65 attributes, ...), with
+English and French content so the language filters have work to do.
+"""
+import os
+import random
+from xml.sax.saxutils import escape
+
+PIES_NS = 'http://www.autocare.org'
+
+ATTRIBUTE_VALUES = {
+    'California Proposition 65': ["WARNING - This product can expose you to chemicals including lead, which is known to "
+                                  "the State of California to cause cancer and birth defects or other reproductive harm. "
+                                  "For more information go to www.P65Warnings.ca.gov"],
+    'Lens Color': ["Clear", "Red", "Amber", "Red, Clear", "Smoke"],
+    'Lens Material': ["Plastic", "Glass", "Polycarbonate"],
+    'Housing Material': ["Plastic", "Aluminum", "Steel"],
+    'Bulb Type': ["Halogen", "LED", "Incandescent", "Xenon"],
+    'Bulbs Included': ["Yes", "No"],
+    'Position': ["Left", "Right", "Left Inner", "Right Outer", "Front", "Rear"],
+    'Components Included': ["Lens and Housing", "Housing Only", "Lens Only"],
+}
+
+DESCRIPTIONS = ["Back Up Light Assembly", "Tail Light Assembly", "Headlight Assembly",
+                "Fog Light Assembly", "Side Marker Light", "Turn Signal Light Assembly"]
+
+def part_number(i):
+    return f"SY{i // 1000:03d}-{i % 1000:03d}{'LR'[i % 2]}"
+
+def _pies_item(rng, i, n_attributes):
+    desc = rng.choice(DESCRIPTIONS)
+    attrs = list(ATTRIBUTE_VALUES.items())
+    extra = [(f"Spec {k}", [f"{k}-{v}" for v in range(8)]) for k in range(max(0, n_attributes - len(attrs)))]
+    chosen = (attrs + extra)[:n_attributes]
+
+    parts = [
+        f'<Item MaintenanceType="A"><PartNumber>{part_number(i)}</PartNumber>',
+        '<BrandAAIAID>SYNT</BrandAAIAID><BrandLabel>Synthetic</BrandLabel>',
+        '<ACESApplications>Y</ACESApplications><PartTerminologyID>15012</PartTerminologyID>',
+        '<Descriptions>',
+        f'<Description MaintenanceType="A" DescriptionCode="LAB" LanguageCode="EN">{desc}</Description>',
+        f'<Description MaintenanceType="A" DescriptionCode="DES" LanguageCode="EN">{desc}</Description>',
+        f'<Description MaintenanceType="A" DescriptionCode="DES" LanguageCode="FR">Ensemble {i}</Description>',
+        '</Descriptions>',
+        '<ExtendedInformation><MarketCopy>',
+        f'<MarketCopyContent LanguageCode="EN">Direct fit replacement for part {i}</MarketCopyContent>',
+        '<MarketCopyContent LanguageCode="EN">DOT/SAE compliant</MarketCopyContent>',
+        '<MarketCopyContent LanguageCode="FR">Remplacement direct</MarketCopyContent>',
+        '</MarketCopy></ExtendedInformation>',
+        '<ProductAttributes>',
+    ]
+    for attr_id, values in chosen:
+        value = escape(rng.choice(values))
+        parts.append(f'<ProductAttribute MaintenanceType="A" AttributeID="{attr_id}" PADBAttribute="N" '
+                     f'LanguageCode="EN">{value}</ProductAttribute>')
+    parts.append('</ProductAttributes>')
+    parts.append('<PartInterchangeInfo>')
+    for k in range(rng.randint(1, 4)):
+        parts.append(f'<PartInterchange MaintenanceType="A" BrandAAIAID="XX{k:02d}">'
+                     f'<PartNumber>IC{i}-{k}</PartNumber></PartInterchange>')
+    parts.append('</PartInterchangeInfo>')
+    parts.append('<DigitalAssets>')
+    for k in range(rng.randint(0, 3)):
+        parts.append(f'<DigitalFileInformation MaintenanceType="A" LanguageCode="EN">'
+                     f'<FileName>{part_number(i)}_{k}.jpg</FileName></DigitalFileInformation>')
+    parts.append('</DigitalAssets></Item>\n')
+    return "".join(parts)
+
+def write_pies(path, n_items, n_attributes=8, namespaced=True, seed=0, first=0):
+    """Write a PIES 7.2 feed with n_items Items of n_attributes EN attributes each.
+
+    Part numbers are part_number(first) .. part_number(first + n_items - 1).
+    """
+    rng = random.Random(seed)
+    xmlns = f' xmlns="{PIES_NS}" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"' if namespaced else ""
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>')
+        fh.write(f'<PIES{xmlns}><Header><PIESVersion>7.2</PIESVersion><SubmissionType>FULL</SubmissionType>'
+                 '<BlanketEffectiveDate>2025-12-01</BlanketEffectiveDate><LanguageCode>EN</LanguageCode>'
+                 '</Header><Items>\n')
+        for i in range(first, first + n_items):
+            fh.write(_pies_item(rng, i, n_attributes))
+        fh.write(f'</Items><Trailer><ItemCount>{n_items}</ItemCount>'
+                 '<TransactionDate>2025-11-25</TransactionDate></Trailer></PIES>')
+    return path
+
+def write_aces(path, n_apps, n_parts, n_vehicles=25000, seed=0):
+    """Write an ACES 4.2 feed with n_apps Apps spread over n_parts part numbers.
+
+    Like the vendor files (and as AcesParser expects) the ACES document has no
+    default namespace.
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>'
+                 '<ACES xmlns:xsi="http://www.w3.org/2001/XMLSchema" version="4.2"><Header>'
+                 '<Company>Synthetic</Company><TransferDate>2025-12-01</TransferDate>'
+                 '<EffectiveDate>2025-12-01</EffectiveDate><SubmissionType>FULL</SubmissionType></Header>\n')
+        for i in range(1, n_apps + 1):
+            bv = rng.randint(1, n_vehicles)
+            part = part_number(rng.randrange(n_parts))
+            submodel = f'<SubModel id="{rng.randint(1, 900)}"/>' if rng.random() < 0.3 else ""
+            note = '<Note>w/Stow &apos;n Go Seating</Note>' if rng.random() < 0.2 else ""
+            fh.write(f'<App action="A" id="{i}" validate="yes"><BaseVehicle id="{bv}"/>{submodel}{note}'
+                     f'<Qty>1</Qty><PartType id="15012"/><Position id="{rng.randint(1, 30)}"/>'
+                     f'<Part>{part}</Part></App>\n')
+        fh.write('</ACES>')
+    return path
+
+# Roughly: "first-stop" is the size of DB-2025-10-30-Aces_First Stop.xml (~89 MB)
+PROFILES = {
+    'small': {'pies_items': 2000, 'attributes': 8, 'aces_apps': 20000},
+    'medium': {'pies_items': 10000, 'attributes': 12, 'aces_apps': 100000},
+    'first-stop': {'pies_items': 30000, 'attributes': 16, 'aces_apps': 400000},
+}
+
+def generate_drop(input_dir, pies_items, attributes, aces_apps, seed=0):
+    """Write a namespaced and an un-namespaced PIES file plus an ACES file into input_dir.
+
+    Returns {'pies': [...], 'aces': [...]} paths with their record counts.
+    """
+    os.makedirs(input_dir, exist_ok=True)
+    half = pies_items // 2
+    pies = [
+        (write_pies(os.path.join(input_dir, 'SYN-Pies.xml'), half, attributes, True, seed), half),
+        (write_pies(os.path.join(input_dir, 'SYN-Pies_NoNS.xml'), pies_items - half, attributes, False, seed + 1,
+                    first=half), pies_items - half),
+    ]
+    aces = [
+        (write_aces(os.path.join(input_dir, 'SYN-Aces.xml'), aces_apps, max(pies_items, 1), seed=seed + 2), aces_apps),
+    ]
+    return {'pies': pies, 'aces': aces}
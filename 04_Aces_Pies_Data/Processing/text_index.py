@@ -0,0 +1,377 @@
+import json
+import logging
+import os
+import re
+import shutil
+from array import array
+
+import numpy as np
+
+from catalog_export import iter_rows
+
+TOKEN_RE = re.compile(r'[0-9a-z]+')
+# "quoted phrases" or single words
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Indexed PIES columns, besides every Attribute_* column
+TEXT_COLUMNS = ('Description', 'Features')
+ATTRIBUTE_PREFIX = 'Attribute_'
+MANIFEST_FILE = 'segments.json'
+SEGMENT_ARRAYS = ('terms', 'term_ptr', 'docs', 'positions', 'parts', 'brands', 'deleted')
+
+def tokenize(text):
+    """Lower-cased alphanumeric runs ("Back-Up Light" -> back, up, light)."""
+    return TOKEN_RE.findall(text.lower())
+
+def parse_query(query):
+    """Split a query into clauses (token lists); every clause must match.
+
+    A quoted phrase is one clause, as is a single word that tokenizes into
+    several tokens (e.g. back-up).
+    """
+    clauses = []
+    for phrase, word in QUERY_RE.findall(query):
+        tokens = tokenize(phrase or word)
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+def _text_array(values):
+    # Fixed-width unicode, which np.load can memory-map (object arrays can't be)
+    width = max((len(v) for v in values), default=1) or 1
+    return np.array(values, dtype=f'<U{width}')
+
+def _doc_texts(record):
+    texts = [record.get(c) for c in TEXT_COLUMNS]
+    texts += [v for k, v in record.items() if k.startswith(ATTRIBUTE_PREFIX)]
+    return [t for t in texts if isinstance(t, str) and t]
+
+def _write_segment(path, vocab, parts, brands, deleted, term_codes, docs, positions):
+    """Save one segment; the last doc per PartNumber wins and doc ids follow PartNumber order."""
+    last = {p: i for i, p in enumerate(parts)}
+    keep = np.array(sorted(last.values(), key=parts.__getitem__), dtype=np.int64)
+    doc_map = np.full(len(parts), -1, dtype=np.int64)
+    doc_map[keep] = np.arange(len(keep))
+
+    docs = doc_map[docs] if len(docs) else docs.astype(np.int64)
+    live = docs >= 0
+    term_codes, docs, positions = term_codes[live], docs[live], positions[live]
+
+    # Only terms that still have postings, in sorted order for binary search
+    used = np.unique(term_codes)
+    names = [vocab[c] for c in used]
+    order = sorted(range(len(used)), key=names.__getitem__)
+    new_code = np.zeros(len(vocab), dtype=np.int64)
+    new_code[used[order]] = np.arange(len(used))
+    term_codes = new_code[term_codes] if len(term_codes) else term_codes
+
+    by_term = np.lexsort((positions, docs, term_codes))
+    term_ptr = np.zeros(len(used) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_codes, minlength=len(used)), out=term_ptr[1:])
+
+    arrays = {
+        'terms': _text_array([names[i] for i in order]),
+        'term_ptr': term_ptr,
+        'docs': docs[by_term].astype(np.int32),
+        'positions': positions[by_term].astype(np.int32),
+        'parts': _text_array([parts[i] for i in keep]),
+        'brands': _text_array([brands[i] for i in keep]),
+        'deleted': np.array([deleted[i] for i in keep], dtype=bool),
+    }
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_path, name + '.npy'), arr)
+    os.replace(tmp_path, path)
+    return len(keep)
+
+class SegmentBuilder:
+    """Collects documents (one per PartNumber) as positional postings for one segment.
+
+    Token positions restart counting with a gap at every field, so a phrase
+    never matches across Description/Features/attribute boundaries.
+    """
+
+    def __init__(self):
+        self.vocab = {}
+        self.parts = []
+        self.brands = []
+        self.deleted = []
+        self._terms = array('i')
+        self._docs = array('i')
+        self._positions = array('i')
+
+    def __len__(self):
+        return len(self.parts)
+
+    def add(self, record):
+        doc = len(self.parts)
+        self.parts.append(record['PartNumber'])
+        brand = record.get('Brand')
+        self.brands.append(brand if isinstance(brand, str) else "")
+        self.deleted.append(False)
+
+        pos = 0
+        for text in _doc_texts(record):
+            for token in tokenize(text):
+                code = self.vocab.get(token)
+                if code is None:
+                    code = self.vocab[token] = len(self.vocab)
+                self._terms.append(code)
+                self._docs.append(doc)
+                self._positions.append(pos)
+                pos += 1
+            pos += 1
+
+    def delete(self, part_num):
+        """Tombstone: hides the part in older segments."""
+        self.parts.append(part_num)
+        self.brands.append("")
+        self.deleted.append(True)
+
+    def write(self, path):
+        as_array = lambda buf: np.frombuffer(buf, dtype=np.int32).astype(np.int64)
+        return _write_segment(path, list(self.vocab), self.parts, self.brands, self.deleted,
+                              as_array(self._terms), as_array(self._docs), as_array(self._positions))
+
+class Segment:
+    """One immutable, memory-mapped piece of the index."""
+
+    def __init__(self, path):
+        self.path = path
+        for name in SEGMENT_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r'))
+        # Set by TextIndex: docs not deleted or replaced by a newer segment
+        self.live = ~np.asarray(self.deleted)
+
+    def postings(self, term):
+        """(docs, positions) of a term, sorted by doc then position."""
+        i = np.searchsorted(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            start, end = self.term_ptr[i], self.term_ptr[i + 1]
+            return self.docs[start:end], self.positions[start:end]
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty
+
+    def match(self, tokens):
+        """Sorted doc ids containing the token sequence."""
+        if len(tokens) == 1:
+            return np.unique(self.postings(tokens[0])[0])
+
+        # Phrase: doc/start-position pairs that every token lines up with
+        starts = None
+        for offset, token in enumerate(tokens):
+            docs, positions = self.postings(token)
+            ok = positions >= offset
+            keys = (docs[ok].astype(np.int64) << 32) | (positions[ok] - offset)
+            starts = keys if starts is None else np.intersect1d(starts, keys, assume_unique=False)
+            if not len(starts):
+                break
+        return np.unique(starts >> 32)
+
+class TextIndex:
+    """Term/phrase search over PIES descriptions, features and attributes.
+
+    The index is a list of segments (see segments.json): the full build is
+    one segment and every update_index() adds a small one, in which newer
+    documents replace older ones for the same PartNumber and tombstones
+    remove them. All arrays are memory-mapped, so opening is cheap and
+    queries only touch the postings of their terms.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.manifest = _read_manifest(index_dir)
+        self.segments = [Segment(os.path.join(index_dir, s['name'])) for s in self.manifest['segments']]
+
+        shadowed = None
+        for segment in reversed(self.segments):
+            if shadowed is not None and len(shadowed):
+                segment.live &= ~np.isin(segment.parts, shadowed)
+            shadowed = segment.parts if shadowed is None else np.concatenate([shadowed, segment.parts])
+
+    def __len__(self):
+        return int(sum(segment.live.sum() for segment in self.segments))
+
+    def search(self, query, brand=None, limit=None):
+        """PartNumbers (sorted) matching every word/"phrase" of the query, optionally of one Brand."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        found = []
+        for segment in self.segments:
+            docs = None
+            for tokens in clauses:
+                matched = segment.match(tokens)
+                docs = matched if docs is None else np.intersect1d(docs, matched, assume_unique=True)
+                if not len(docs):
+                    break
+            docs = docs[segment.live[docs]]
+            if brand is not None and len(docs):
+                docs = docs[np.char.lower(segment.brands[docs]) == brand.lower()]
+            found.extend(segment.parts[docs].tolist())
+
+        # A part is live in one segment only, so there's nothing to de-duplicate
+        found.sort()
+        return found[:limit] if limit else found
+
+def _read_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'segments': [], 'feeds': [], 'next': 1}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+def _save_manifest(index_dir, manifest):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, path)
+
+    # Segments no longer listed (replaced by a build or compaction)
+    listed = {s['name'] for s in manifest['segments']}
+    for name in os.listdir(index_dir):
+        if name.startswith('seg-') and name not in listed:
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+def _add_segment(index_dir, manifest, builder, feeds, replace=False):
+    name = f"seg-{manifest['next']:06d}"
+    docs = builder.write(os.path.join(index_dir, name))
+    entry = {'name': name, 'docs': docs}
+    manifest['next'] += 1
+    manifest['segments'] = [entry] if replace else manifest['segments'] + [entry]
+    manifest['feeds'] = list(feeds) if replace else manifest['feeds'] + list(feeds)
+    _save_manifest(index_dir, manifest)
+    return docs
+
+def build_index(items_df, index_dir):
+    """Replace the index with one segment over the consolidated items; returns the documents indexed."""
+    os.makedirs(index_dir, exist_ok=True)
+    builder = SegmentBuilder()
+    columns = [str(c) for c in items_df.columns]
+    for row in iter_rows(items_df):
+        builder.add(dict(zip(columns, row)))
+    docs = _add_segment(index_dir, _read_manifest(index_dir), builder, [], replace=True)
+    logging.info(f"Indexed {docs} parts into {index_dir}")
+    return docs
+
+def update_index(index_dir, items, feed=None, max_segments=8):
+    """Add one PIES feed's (MaintenanceType, item record) pairs as a new segment.
+
+    MaintenanceType "D" removes the part. feed (e.g. a content digest) is
+    remembered, so the same feed is never indexed twice; returns the number
+    of records indexed (0 when it was). Once there are more than
+    max_segments segments they are compacted into one.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = _read_manifest(index_dir)
+    if feed is not None and feed in manifest['feeds']:
+        logging.info(f"{feed} is already indexed")
+        return 0
+
+    builder = SegmentBuilder()
+    for maintenance_type, record in items:
+        if maintenance_type == 'D':
+            builder.delete(record['PartNumber'])
+        else:
+            builder.add(record)
+    if not len(builder):
+        return 0
+    _add_segment(index_dir, manifest, builder, [feed] if feed is not None else [])
+    logging.info(f"Indexed {len(builder)} records into {index_dir} ({len(manifest['segments'])} segments)")
+
+    if len(manifest['segments']) > max_segments:
+        compact(index_dir)
+    return len(builder)
+
+def compact(index_dir):
+    """Merge all segments into one, dropping replaced documents and tombstones."""
+    index = TextIndex(index_dir)
+    vocab = {}
+    parts, brands = [], []
+    term_codes, docs, positions = [], [], []
+    for segment in index.segments:
+        live_docs = np.flatnonzero(segment.live)
+        doc_map = np.full(len(segment.parts), -1, dtype=np.int64)
+        doc_map[live_docs] = len(parts) + np.arange(len(live_docs))
+        parts.extend(segment.parts[live_docs].tolist())
+        brands.extend(segment.brands[live_docs].tolist())
+
+        term_map = np.array([vocab.setdefault(t, len(vocab)) for t in segment.terms.tolist()], dtype=np.int64)
+        rows = np.repeat(np.arange(len(segment.terms)), np.diff(segment.term_ptr))
+        seg_docs = doc_map[segment.docs]
+        keep = seg_docs >= 0
+        term_codes.append(term_map[rows[keep]] if len(rows) else rows)
+        docs.append(seg_docs[keep])
+        positions.append(np.asarray(segment.positions)[keep].astype(np.int64))
+
+    manifest = index.manifest
+    del index
+    name = f"seg-{manifest['next']:06d}"
+    n = _write_segment(os.path.join(index_dir, name), list(vocab), parts, brands, [False] * len(parts),
+                       np.concatenate(term_codes), np.concatenate(docs), np.concatenate(positions))
+    manifest['next'] += 1
+    manifest['segments'] = [{'name': name, 'docs': n}]
+    _save_manifest(index_dir, manifest)
+    logging.info(f"Compacted {index_dir} into one segment of {n} parts")
+
+def index_feed(index_dir, path, max_segments=8):
+    """Add every PIES feed in an .xml file or .zip drop to the index; returns records indexed."""
+    import zipfile
+
+    from convert_data import PiesParser, open_zip_member, parser_for
+    from parse_cache import content_digest
+
+    if path.lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as zf:
+            members = [info.filename for info in zf.infolist() if not info.is_dir()]
+    else:
+        members = [None]
+
+    indexed = 0
+    for member in members:
+        label = os.path.join(path, member) if member is not None else path
+        if parser_for(label) is not PiesParser:
+            continue
+        stream = open_zip_member(path, member) if member is not None else None
+        try:
+            parser = PiesParser(label, stream)
+            indexed += update_index(index_dir, parser.iter_items(), content_digest(path, member), max_segments)
+        finally:
+            if stream is not None:
+                stream.close()
+    return indexed
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    arg_parser = argparse.ArgumentParser(description="Search or update the catalog full-text index.")
+    sub = arg_parser.add_subparsers(dest='command', required=True)
+    search_cmd = sub.add_parser('search', help="Print the PartNumbers matching a query")
+    search_cmd.add_argument('index_dir')
+    search_cmd.add_argument('query', help='Words and "quoted phrases"; all must match')
+    search_cmd.add_argument('--brand', help="Only parts of this Brand")
+    search_cmd.add_argument('--limit', type=int)
+    update_cmd = sub.add_parser('update', help="Index new PIES feeds (.xml or .zip)")
+    update_cmd.add_argument('index_dir')
+    update_cmd.add_argument('feeds', nargs='+')
+    update_cmd.add_argument('--max-segments', type=int, default=8, help="Compact past this many segments")
+    args = arg_parser.parse_args()
+
+    if args.command == 'search':
+        index = TextIndex(args.index_dir)
+        start = time.perf_counter()
+        found = index.search(args.query, brand=args.brand, limit=args.limit)
+        elapsed = time.perf_counter() - start
+        for part_num in found:
+            print(part_num)
+        logging.info(f"{len(found)} parts in {elapsed * 1000:.1f} ms")
+    else:
+        for feed in args.feeds:
+            index_feed(args.index_dir, feed, args.max_segments)
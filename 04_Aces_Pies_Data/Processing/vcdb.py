@@ -0,0 +1,157 @@
+import csv
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+# Compiled tables, all dense arrays indexed by the VCdb id so lookups are O(1)
+BASE_VEHICLE_FILE = 'base_vehicle.npy'
+NAME_FILES = {
+    'make': 'make.npy',
+    'model': 'model.npy',
+    'submodel': 'submodel.npy',
+}
+
+BASE_VEHICLE_DTYPE = np.dtype([('year', '<u2'), ('make', '<i4'), ('model', '<i4')])
+
+def _find_table(src_dir, name):
+    """Locate a VCdb ASCII table (e.g. BaseVehicle.txt) case-insensitively."""
+    wanted = name.lower()
+    for f in os.listdir(src_dir):
+        stem, ext = os.path.splitext(f)
+        if stem.lower() == wanted and ext.lower() in ('.txt', '.csv'):
+            return os.path.join(src_dir, f)
+    raise FileNotFoundError(f"VCdb table {name} not found in {src_dir}")
+
+def _read_table(path):
+    """Yield rows of a pipe/tab/comma delimited VCdb export as dicts keyed by lower-case header."""
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        header = fh.readline()
+        delimiter = max('|\t,', key=header.count)
+        fieldnames = [h.strip().lower() for h in header.rstrip('\r\n').split(delimiter)]
+        for row in csv.DictReader(fh, fieldnames=fieldnames, delimiter=delimiter):
+            yield row
+
+def _name_array(rows, id_col, name_col):
+    names = {int(r[id_col]): (r[name_col] or "").strip() for r in rows if r.get(id_col)}
+    width = max((len(n) for n in names.values()), default=1) or 1
+    arr = np.zeros(max(names, default=0) + 1, dtype=f'<U{width}')
+    for i, n in names.items():
+        arr[i] = n
+    return arr
+
+def compile_vcdb(src_dir, out_dir):
+    """Turn a VCdb ASCII snapshot into the memory-mappable arrays VcdbResolver reads.
+
+    Needs BaseVehicle, Make, Model and SubModel tables from the snapshot.
+    """
+    logging.info(f"Compiling VCdb snapshot {src_dir} -> {out_dir}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = [r for r in _read_table(_find_table(src_dir, 'BaseVehicle')) if r.get('basevehicleid')]
+    table = np.zeros(max((int(r['basevehicleid']) for r in rows), default=0) + 1, dtype=BASE_VEHICLE_DTYPE)
+    table['make'] = -1
+    table['model'] = -1
+    for r in rows:
+        i = int(r['basevehicleid'])
+        table[i] = (int(r['yearid']), int(r['makeid']), int(r['modelid']))
+    np.save(os.path.join(out_dir, BASE_VEHICLE_FILE), table)
+
+    names = {
+        'make': _name_array(_read_table(_find_table(src_dir, 'Make')), 'makeid', 'makename'),
+        'model': _name_array(_read_table(_find_table(src_dir, 'Model')), 'modelid', 'modelname'),
+        'submodel': _name_array(_read_table(_find_table(src_dir, 'SubModel')), 'submodelid', 'submodelname'),
+    }
+    for key, arr in names.items():
+        np.save(os.path.join(out_dir, NAME_FILES[key]), arr)
+
+    logging.info(f"Compiled {len(rows)} base vehicles")
+    return out_dir
+
+class VcdbResolver:
+    """O(1) BaseVehicle/SubModel -> 'Year Make Model Submodel' lookups.
+
+    Tables are opened with np.load(mmap_mode='r'), so every worker process
+    maps the same pages from the OS cache instead of loading its own copy.
+    Labels are memoized per (BaseVehicle, SubModel) pair.
+    """
+
+    def __init__(self, compiled_dir):
+        self.compiled_dir = compiled_dir
+        self.base_vehicles = np.load(os.path.join(compiled_dir, BASE_VEHICLE_FILE), mmap_mode='r')
+        self.makes = np.load(os.path.join(compiled_dir, NAME_FILES['make']), mmap_mode='r')
+        self.models = np.load(os.path.join(compiled_dir, NAME_FILES['model']), mmap_mode='r')
+        self.submodels = np.load(os.path.join(compiled_dir, NAME_FILES['submodel']), mmap_mode='r')
+        self._labels = {}
+        self._digest = None
+
+    @property
+    def digest(self):
+        """Content hash of the compiled tables (used in parse cache keys)."""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=8)
+            for f in [BASE_VEHICLE_FILE] + sorted(NAME_FILES.values()):
+                with open(os.path.join(self.compiled_dir, f), 'rb') as fh:
+                    for chunk in iter(lambda: fh.read(1 << 20), b""):
+                        h.update(chunk)
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def _name(self, table, i):
+        if 0 <= i < len(table):
+            return str(table[i])
+        return ""
+
+    def resolve(self, bv_id, submodel_id=None):
+        """Return the vehicle label, or None when the BaseVehicle isn't in the snapshot."""
+        key = (bv_id, submodel_id)
+        label = self._labels.get(key, False)
+        if label is not False:
+            return label
+
+        label = None
+        try:
+            i = int(bv_id)
+        except (TypeError, ValueError):
+            i = -1
+        if 0 <= i < len(self.base_vehicles):
+            year, make, model = self.base_vehicles[i]
+            if year:
+                parts = [str(year), self._name(self.makes, make), self._name(self.models, model)]
+                if submodel_id:
+                    try:
+                        parts.append(self._name(self.submodels, int(submodel_id)))
+                    except ValueError:
+                        pass
+                label = " ".join(p for p in parts if p)
+        self._labels[key] = label
+        return label
+
+_open_resolvers = {}
+
+def open_vcdb(path):
+    """Open (once per process) the resolver for a compiled dir or a raw snapshot dir.
+
+    A raw snapshot (BaseVehicle.txt etc.) is compiled into <path>/compiled on
+    first use.
+    """
+    resolver = _open_resolvers.get(path)
+    if resolver is None:
+        compiled_dir = path
+        if not os.path.exists(os.path.join(path, BASE_VEHICLE_FILE)):
+            compiled_dir = os.path.join(path, 'compiled')
+            if not os.path.exists(os.path.join(compiled_dir, BASE_VEHICLE_FILE)):
+                compile_vcdb(path, compiled_dir)
+        resolver = _open_resolvers[path] = VcdbResolver(compiled_dir)
+    return resolver
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    arg_parser = argparse.ArgumentParser(description="Compile a VCdb ASCII snapshot for fast BaseVehicle lookups.")
+    arg_parser.add_argument('src_dir', help="Folder with BaseVehicle/Make/Model/SubModel tables")
+    arg_parser.add_argument('out_dir', help="Folder to write the compiled tables to")
+    args = arg_parser.parse_args()
+    compile_vcdb(args.src_dir, args.out_dir)
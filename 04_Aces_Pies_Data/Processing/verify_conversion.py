@@ -0,0 +1,338 @@
+"""Validate the consolidated catalog against the source feeds in bounded memory.
+
+    python verify_conversion.py [work_dir] [--output Output/Consolidated_Catalog.xlsx] [--sample 50]
+
+The output (CSV, XLSX including split sheets/workbooks, or Parquet) is
+streamed row by row and the feeds under Input/ are re-read with the
+pipeline's own parsers. Per-part data from both sides is hash-partitioned
+into spill files, so each check only holds one bucket in memory:
+
+- coverage: every PIES part is in the output, and nothing else is
+- duplicate PartNumbers
+- fitment: VehicleIDs per part match the distinct BaseVehicles in the ACES feeds
+- null rate per column: a column without any value fails, as does any
+  column over its --max-null-rate
+- spot checks: a reservoir sample of output rows is compared field by field
+  with the source Item
+
+Checks follow the full-rebuild semantics of process_directory (the last
+Item per PartNumber wins, MaintenanceType/action "D" records are skipped).
+Exits with status 1 when any check fails, 2 when the output can't be read.
+"""
+import argparse
+import csv
+import logging
+import os
+import random
+import sys
+import tempfile
+import zlib
+from collections import Counter
+
+from convert_data import (DELETE_CODE, KIT_COLUMN, PROJECT_DIR, AcesParser, PiesParser, iter_input_sources,
+                          open_zip_member)
+
+# Columns the spot check doesn't compare with the source Item
+DERIVED_COLUMNS = {'VehicleIDs', 'Vehicles', 'KitVehicleIDs', 'KitVehicles', KIT_COLUMN}
+# Mismatches listed per check
+MAX_EXAMPLES = 10
+
+def _cell(value):
+    if value is None or value == "":
+        return None
+    return str(value)
+
+def _xlsx_paths(path):
+    """The workbook plus the numbered ones StreamingWorkbookWriter rolls over to."""
+    base, ext = os.path.splitext(path)
+    paths = [path]
+    while os.path.exists(f"{base}_{len(paths) + 1}{ext}"):
+        paths.append(f"{base}_{len(paths) + 1}{ext}")
+    return paths
+
+def iter_output(path, chunk_rows=50000):
+    """Return (columns, rows) for a catalog output; rows yields tuples with None for empty cells."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        fh = open(path, newline='', encoding='utf-8')
+        reader = csv.reader(fh)
+        columns = next(reader, [])
+
+        def rows():
+            with fh:
+                for row in reader:
+                    yield tuple(_cell(v) for v in row)
+        return columns, rows()
+
+    if ext == '.xlsx':
+        from openpyxl import load_workbook
+
+        paths = _xlsx_paths(path)
+        wb = load_workbook(paths[0], read_only=True)
+        columns = [_cell(v) for v in next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ())]
+        wb.close()
+
+        def rows():
+            width = len(columns)
+            for p in paths:
+                book = load_workbook(p, read_only=True)
+                try:
+                    # Every sheet repeats the header
+                    for ws in book.worksheets:
+                        for row in ws.iter_rows(min_row=2, values_only=True):
+                            row = tuple(_cell(v) for v in row[:width])
+                            yield row + (None,) * (width - len(row))
+                finally:
+                    book.close()
+        return columns, rows()
+
+    if ext == '.parquet':
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        columns = pf.schema_arrow.names
+
+        def rows():
+            for batch in pf.iter_batches(batch_size=chunk_rows):
+                data = batch.to_pydict()
+                yield from zip(*((_cell(v) for v in data[c]) for c in columns))
+        return columns, rows()
+
+    raise ValueError(f"Unsupported output format: {path}")
+
+class BucketSpill:
+    """Rows spilled to n_buckets files on disk, partitioned by a hash of their key.
+
+    All rows of one key land in the same bucket, so a bucket can be checked
+    on its own; only one bucket has to be loaded at a time.
+    """
+
+    def __init__(self, directory, name, n_buckets):
+        self.paths = [os.path.join(directory, f"{name}-{i:03d}.tsv") for i in range(n_buckets)]
+        self._files = [open(p, 'w', newline='', encoding='utf-8') for p in self.paths]
+        self._writers = [csv.writer(fh, delimiter='\t') for fh in self._files]
+
+    def add(self, key, *values):
+        self._writers[zlib.crc32(key.encode('utf-8')) % len(self._writers)].writerow((key,) + values)
+
+    def close(self):
+        for fh in self._files:
+            fh.close()
+
+    def read(self, i):
+        with open(self.paths[i], newline='', encoding='utf-8') as fh:
+            yield from csv.reader(fh, delimiter='\t')
+
+class Validator:
+    def __init__(self, work_dir, output_path, spill_dir, n_buckets=64, sample_size=50, seed=0,
+                 max_null_rates=None):
+        self.input_dir = os.path.join(work_dir, 'Input')
+        self.output_path = output_path
+        self.n_buckets = n_buckets
+        self.sample_size = sample_size
+        self.random = random.Random(seed)
+        self.max_null_rates = max_null_rates or {}
+        self.spills = {name: BucketSpill(spill_dir, name, n_buckets) for name in ('output', 'items', 'fitment')}
+        self.failures = {}
+        self.columns = []
+        self.n_rows = 0
+        self.non_null = Counter()
+        self.sample = []
+        self.expected = {}
+        self.expected_vehicles = {}
+
+    def fail(self, check, message):
+        self.failures.setdefault(check, []).append(message)
+
+    def read_output(self):
+        """One pass over the output: null counts, reservoir sample, per-part spill."""
+        self.columns, rows = iter_output(self.output_path)
+        if 'PartNumber' not in self.columns:
+            raise ValueError(f"{self.output_path} has no PartNumber column")
+        part_col = self.columns.index('PartNumber')
+        fit_col = self.columns.index('VehicleIDs') if 'VehicleIDs' in self.columns else None
+        spill = self.spills['output']
+
+        for row in rows:
+            self.n_rows += 1
+            for column, value in zip(self.columns, row):
+                if value is not None:
+                    self.non_null[column] += 1
+
+            # Algorithm R: every row ends up in the sample with equal probability
+            if len(self.sample) < self.sample_size:
+                self.sample.append(row)
+            else:
+                j = self.random.randrange(self.n_rows)
+                if j < self.sample_size:
+                    self.sample[j] = row
+
+            part_num = row[part_col]
+            if part_num is None:
+                continue
+            vehicles = row[fit_col] if fit_col is not None else None
+            spill.add(part_num, len(vehicles.split(",")) if vehicles else 0)
+        spill.close()
+        logging.info(f"Read {self.n_rows} rows from {self.output_path}")
+
+    def read_sources(self):
+        """One pass over the feeds: PIES parts, ACES fitment pairs, and the sampled parts' source data."""
+        part_col = self.columns.index('PartNumber')
+        sampled = {row[part_col] for row in self.sample if row[part_col] is not None}
+        self.expected_vehicles = {p: set() for p in sampled}
+
+        for label, parser_cls, path, member in iter_input_sources(self.input_dir):
+            stream = open_zip_member(path, member) if member is not None else None
+            try:
+                if parser_cls is PiesParser:
+                    parser = PiesParser(label, stream)
+                    for maintenance_type, record in parser.iter_items():
+                        if maintenance_type == DELETE_CODE:
+                            continue
+                        part_num = record['PartNumber']
+                        self.spills['items'].add(part_num)
+                        if part_num in sampled:
+                            # Last Item wins, as in merge_pies
+                            self.expected[part_num] = record
+                else:
+                    parser = AcesParser(label, stream)
+                    for part_num, bv_id, submodel_id in parser.iter_fitments():
+                        self.spills['fitment'].add(part_num, bv_id)
+                        if part_num in sampled:
+                            self.expected_vehicles[part_num].add(bv_id)
+                logging.info(f"Read {parser.records} records from {label}")
+            except Exception as e:
+                self.fail('sources', f"{label}: {e}")
+            finally:
+                if stream is not None:
+                    stream.close()
+        self.spills['items'].close()
+        self.spills['fitment'].close()
+
+    def check_buckets(self):
+        for i in range(self.n_buckets):
+            out_rows = Counter()
+            out_fitment = {}
+            for part_num, n_vehicles in self.spills['output'].read(i):
+                out_rows[part_num] += 1
+                out_fitment[part_num] = int(n_vehicles)
+            src_parts = {row[0] for row in self.spills['items'].read(i)}
+            src_fitment = {}
+            for part_num, bv_id in self.spills['fitment'].read(i):
+                src_fitment.setdefault(part_num, set()).add(bv_id)
+
+            for part_num, n in out_rows.items():
+                if n > 1:
+                    self.fail('duplicates', f"{part_num} appears {n} times")
+            for part_num in src_parts - out_rows.keys():
+                self.fail('coverage', f"{part_num} is in the PIES feeds but not in the output")
+            for part_num in out_rows.keys() - src_parts:
+                self.fail('coverage', f"{part_num} is in the output but in no PIES feed")
+            for part_num, n in out_fitment.items():
+                expected = len(src_fitment.get(part_num, ()))
+                if n != expected:
+                    self.fail('fitment', f"{part_num} has {n} VehicleIDs, the ACES feeds give {expected}")
+
+    def check_nulls(self):
+        if not self.n_rows:
+            self.fail('nulls', "the output has no rows")
+            return
+        for column in self.columns:
+            rate = 1 - self.non_null[column] / self.n_rows
+            if self.non_null[column] == 0:
+                self.fail('nulls', f"{column} has no values")
+            if column == 'PartNumber' and rate > 0:
+                self.fail('nulls', f"{self.n_rows - self.non_null[column]} rows have no PartNumber")
+            limit = self.max_null_rates.get(column)
+            if limit is not None and rate > limit:
+                self.fail('nulls', f"{column} is {rate:.1%} empty (limit {limit:.1%})")
+
+    def check_sample(self):
+        part_col = self.columns.index('PartNumber')
+        for row in self.sample:
+            part_num = row[part_col]
+            record = self.expected.get(part_num)
+            if record is None:
+                # Already reported by the coverage check
+                continue
+            is_kit = KIT_COLUMN in self.columns and row[self.columns.index(KIT_COLUMN)] is not None
+            for column, value in zip(self.columns, row):
+                if column == 'VehicleIDs':
+                    got = set(value.split(",")) if value else set()
+                    if got != self.expected_vehicles.get(part_num, set()):
+                        self.fail('spot checks', f"{part_num}: VehicleIDs differ from the ACES feeds")
+                    continue
+                if column in DERIVED_COLUMNS:
+                    continue
+                expected = _cell(record.get(column))
+                if expected is None and is_kit and column.startswith('Attribute_'):
+                    # Filled in from the kit's components (--kits)
+                    continue
+                if value != expected:
+                    self.fail('spot checks', f"{part_num}: {column} is {value!r}, the feed has {expected!r}")
+
+    def run(self):
+        self.read_output()
+        self.read_sources()
+        self.check_buckets()
+        self.check_nulls()
+        self.check_sample()
+
+    def print_report(self):
+        print(f"Output: {self.output_path} ({self.n_rows} rows, {len(self.columns)} columns)")
+        print("Null rate per column:")
+        for column in self.columns:
+            rate = 1 - self.non_null[column] / self.n_rows if self.n_rows else 1
+            print(f"  {column:<40} {rate:7.1%}")
+        print(f"Spot-checked {len(self.sample)} sampled rows")
+
+        for check in ('sources', 'coverage', 'duplicates', 'fitment', 'nulls', 'spot checks'):
+            found = self.failures.get(check, [])
+            print(f"{check}: {'OK' if not found else f'{len(found)} mismatches'}")
+            for message in found[:MAX_EXAMPLES]:
+                print(f"    {message}")
+            if len(found) > MAX_EXAMPLES:
+                print(f"    ... and {len(found) - MAX_EXAMPLES} more")
+
+def _null_rate(text):
+    column, sep, rate = text.rpartition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError("expected COLUMN=RATE, e.g. Description=0.05")
+    return column, float(rate)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Validate the consolidated catalog against the source feeds.")
+    arg_parser.add_argument('work_dir', nargs='?', default=PROJECT_DIR,
+                            help="Project folder holding Input/ and Output/")
+    arg_parser.add_argument('--output', help="Catalog to check: .csv, .xlsx or .parquet "
+                                             "(default: Output/Consolidated_Catalog.csv)")
+    arg_parser.add_argument('--sample', type=int, default=50, help="Rows to spot-check against the feeds")
+    arg_parser.add_argument('--seed', type=int, default=0, help="Seed of the spot-check sample")
+    arg_parser.add_argument('--buckets', type=int, default=64,
+                            help="Spill partitions; more buckets means less memory per check")
+    arg_parser.add_argument('--spill-dir', help="Folder for the temporary spill files (default: system temp)")
+    arg_parser.add_argument('--max-null-rate', type=_null_rate, action='append', default=[],
+                            metavar='COLUMN=RATE', help="Fail when COLUMN is emptier than RATE (0-1); repeatable")
+    args = arg_parser.parse_args(argv)
+
+    output_path = args.output or os.path.join(args.work_dir, 'Output', 'Consolidated_Catalog.csv')
+    if not os.path.exists(output_path):
+        print(f"Error: {output_path} not found.")
+        return 2
+
+    with tempfile.TemporaryDirectory(prefix='verify_', dir=args.spill_dir) as spill_dir:
+        validator = Validator(args.work_dir, output_path, spill_dir, n_buckets=args.buckets,
+                              sample_size=args.sample, seed=args.seed, max_null_rates=dict(args.max_null_rate))
+        try:
+            validator.run()
+        except Exception as e:
+            print(f"Verification Failed: {e}")
+            return 2
+        finally:
+            for spill in validator.spills.values():
+                spill.close()
+        validator.print_report()
+    return 1 if validator.failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""Watch Input/ and rebuild the consolidated catalog as soon as a vendor drop lands.
+
+    python watch_input.py .. --workers 4 --status-port 8765
+
+Input/ is polled for .zip/.xml feeds. A feed counts as landed once its size
+and modification time have not changed for --settle seconds (and, for a
+zip, its central directory can be read), so files that are still being
+copied are never picked up. Landed drops are queued; every job takes all
+drops queued so far and runs process_directory (parsing on a pool of
+--workers processes, reusing the parse cache for feeds that didn't change)
+into a staging folder. Only a successful run is published into Output/,
+file by file with os.replace, so readers see either the previous or the
+new catalog, never a half-written one.
+
+Queue depth and per-job latency (drop detected -> published) are written
+to Output/daemon_status.json after every change and, with --status-port,
+served as JSON over HTTP.
+"""
+import argparse
+import collections
+import http.server
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+
+from convert_data import PROJECT_DIR, process_directory
+
+FEED_EXTENSIONS = ('.zip', '.xml')
+# Names used by copy/download tools while a file is still being written
+PARTIAL_SUFFIXES = ('.part', '.partial', '.tmp', '.crdownload', '.filepart', '~')
+STATUS_FILE = 'daemon_status.json'
+CATALOG_FILE = 'Consolidated_Catalog.csv'
+TEXT_INDEX_DIR = 'text_index'
+# What a conversion run can write into Output/; any of these a run didn't produce is left over from an earlier one
+CATALOG_OUTPUT_RE = re.compile(r"Consolidated_Catalog(?:\.csv|\.db|(?:_\d+)?\.xlsx)")
+RUN_OUTPUTS = (TEXT_INDEX_DIR, 'convert_profile.prof', 'run_report.json')
+
+def is_feed(name):
+    lower = name.lower()
+    return lower.endswith(FEED_EXTENSIONS) and not lower.endswith(PARTIAL_SUFFIXES) and not name.startswith('.')
+
+class DropWatcher:
+    """Polls a folder and reports feeds once they have stopped changing for `settle` seconds."""
+
+    def __init__(self, input_dir, settle=10.0):
+        self.input_dir = input_dir
+        self.settle = settle
+        # path -> (signature, first seen, last change) for feeds still settling
+        self._pending = {}
+        # path -> signature already handed out
+        self._done = {}
+
+    def scan(self):
+        """{path: (size, mtime_ns)} of every feed under the folder."""
+        found = {}
+        for root_dir, dirs, files in os.walk(self.input_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for f in files:
+                if not is_feed(f):
+                    continue
+                path = os.path.join(root_dir, f)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    # Removed between listing and stat
+                    continue
+                found[path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    @property
+    def pending(self):
+        """Number of feeds seen but still settling."""
+        return len(self._pending)
+
+    def mark_current(self):
+        """Treat every feed that's there now as already converted."""
+        self._done = self.scan()
+
+    @staticmethod
+    def _complete(path):
+        if not path.lower().endswith('.zip'):
+            return True
+        try:
+            with zipfile.ZipFile(path):
+                return True
+        except (zipfile.BadZipFile, OSError):
+            return False
+
+    def poll(self, now=None):
+        """Return [(path, first seen)] for feeds that landed or were removed since the last poll."""
+        now = time.time() if now is None else now
+        current = self.scan()
+        ready = []
+        for path, signature in current.items():
+            if self._done.get(path) == signature:
+                self._pending.pop(path, None)
+                continue
+            entry = self._pending.get(path)
+            if entry is None or entry[0] != signature:
+                # New or still growing: restart the settle clock
+                self._pending[path] = (signature, entry[1] if entry else now, now)
+                continue
+            if now - entry[2] >= self.settle and self._complete(path):
+                ready.append((path, entry[1]))
+                self._done[path] = signature
+                del self._pending[path]
+
+        # A removed feed changes the catalog too
+        for path in [p for p in self._done if p not in current]:
+            del self._done[path]
+            ready.append((path, now))
+        for path in [p for p in self._pending if p not in current]:
+            del self._pending[path]
+        return ready
+
+def publish(staging_dir, output_dir):
+    """Move every output of a finished run into output_dir; returns the names published.
+
+    Each file (or directory) is replaced with its own atomic rename, so a
+    reader never sees half a file, but the set as a whole is not swapped at
+    once: for a moment new and old files sit side by side. Outputs of an
+    earlier run that this run didn't write (numbered Consolidated_Catalog_N.xlsx
+    parts past the new last one, a Consolidated_Catalog.db or text_index
+    from a run with --sqlite/--text-index) are deleted afterwards.
+    """
+    names = os.listdir(staging_dir)
+    # The run report goes last, so its presence means the rest is in place
+    outputs = [name for name in names if name != 'run_report.json']
+    for name in outputs:
+        src = os.path.join(staging_dir, name)
+        dst = os.path.join(output_dir, name)
+        if os.path.isdir(src):
+            # Directories (e.g. text_index) are swapped: the old one is moved aside first
+            old = None
+            if os.path.exists(dst):
+                old = tempfile.mkdtemp(prefix=f".old-{name}-", dir=output_dir)
+                os.replace(dst, os.path.join(old, name))
+            os.replace(src, dst)
+            if old is not None:
+                shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(src, dst)
+    remove_stale(output_dir, names)
+    published = list(outputs)
+    if 'run_report.json' in names:
+        os.replace(os.path.join(staging_dir, 'run_report.json'), os.path.join(output_dir, 'run_report.json'))
+        published.append('run_report.json')
+    return published
+
+def remove_stale(output_dir, current):
+    """Delete run outputs in output_dir whose name isn't in current."""
+    for name in os.listdir(output_dir):
+        if name in current or not (CATALOG_OUTPUT_RE.fullmatch(name) or name in RUN_OUTPUTS):
+            continue
+        path = os.path.join(output_dir, name)
+        logging.info(f"Removing {name} left over from an earlier run")
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+class ConversionService:
+    """Queues landed drops and converts them one job at a time.
+
+    Jobs run one after another since they all write the same catalog; each
+    takes every drop queued so far, so a burst of files is one rebuild.
+    """
+
+    def __init__(self, work_dir, poll_interval=2.0, settle=10.0, history=50, **convert_options):
+        self.work_dir = work_dir
+        self.output_dir = os.path.join(work_dir, 'Output')
+        self.poll_interval = poll_interval
+        self.convert_options = convert_options
+        self.watcher = DropWatcher(os.path.join(work_dir, 'Input'), settle)
+        self.queue = queue.Queue()
+        self.jobs = collections.deque(maxlen=history)
+        self.current = None
+        self.counts = {'ok': 0, 'failed': 0}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def catalog_is_current(self):
+        """True when the published catalog is newer than every feed in Input."""
+        catalog = os.path.join(self.output_dir, CATALOG_FILE)
+        if not os.path.exists(catalog):
+            return False
+        built = os.path.getmtime(catalog)
+        return all(signature[1] / 1e9 <= built for signature in self.watcher.scan().values())
+
+    def status(self):
+        with self._lock:
+            finished = [job for job in self.jobs if 'latency_s' in job]
+            return {
+                'queue_depth': self.queue.qsize(),
+                'running': dict(self.current) if self.current else None,
+                'jobs_ok': self.counts['ok'],
+                'jobs_failed': self.counts['failed'],
+                'last_latency_s': finished[-1]['latency_s'] if finished else None,
+                'max_latency_s': max((job['latency_s'] for job in finished), default=None),
+                'jobs': list(self.jobs),
+            }
+
+    def write_status(self):
+        path = os.path.join(self.output_dir, STATUS_FILE)
+        tmp_path = path + '.tmp'
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(self.status(), fh, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Failed to write {path}: {e}")
+
+    def poll(self):
+        """Queue whatever landed since the last poll; returns how many drops were queued."""
+        drops = self.watcher.poll()
+        for path, first_seen in drops:
+            logging.info(f"Queued drop {path} (queue depth {self.queue.qsize() + 1})")
+            self.queue.put((path, first_seen))
+        if drops:
+            self.write_status()
+        return len(drops)
+
+    def run_next(self, timeout=0.5):
+        """Run one job over every queued drop; returns False when the queue was empty."""
+        try:
+            drops = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return False
+        while True:
+            try:
+                drops.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self._run_job(drops)
+        return True
+
+    def _run_job(self, drops):
+        started = time.time()
+        detected = min(first_seen for _, first_seen in drops)
+        with self._lock:
+            job = self.current = {
+                'id': self._next_id,
+                'drops': [os.path.relpath(path, self.work_dir) for path, _ in drops],
+                'detected': round(detected, 3),
+                'started': round(started, 3),
+                'queue_wait_s': round(started - detected, 3),
+            }
+            self._next_id += 1
+        self.write_status()
+        logging.info(f"Job {job['id']}: converting for {len(drops)} drop(s)")
+
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.output_dir)
+        try:
+            options = dict(self.convert_options)
+            if options.get('text_index'):
+                options['text_index'] = os.path.join(staging, os.path.basename(options['text_index']))
+            process_directory(self.work_dir, output_dir=staging, **options)
+            # process_directory logs and carries on after most errors; only publish a complete run
+            if not os.path.exists(os.path.join(staging, CATALOG_FILE)):
+                raise RuntimeError(f"the run produced no {CATALOG_FILE}")
+            job['published'] = publish(staging, self.output_dir)
+            job['status'] = 'ok'
+        except Exception as e:
+            logging.error(f"Job {job['id']} failed: {e}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        finished = time.time()
+        job['processing_s'] = round(finished - started, 3)
+        job['latency_s'] = round(finished - detected, 3)
+        with self._lock:
+            self.counts[job['status']] += 1
+            self.jobs.append(job)
+            self.current = None
+        self.write_status()
+        logging.info(f"Job {job['id']} {job['status']}: {job['processing_s']}s processing, "
+                     f"{job['latency_s']}s from drop to {'publish' if job['status'] == 'ok' else 'failure'}")
+
+    def serve(self, stop):
+        """Poll and convert until stop is set (the watcher runs on its own thread)."""
+        def watch():
+            while not stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.error(f"Polling {self.watcher.input_dir} failed: {e}")
+                stop.wait(self.poll_interval)
+
+        watcher = threading.Thread(target=watch, name='drop-watcher', daemon=True)
+        watcher.start()
+        while not stop.is_set():
+            self.run_next()
+        watcher.join()
+
+def serve_status(service, port, host='127.0.0.1'):
+    """Serve service.status() as JSON on http://host:port/ from a background thread."""
+    class StatusHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(service.status(), indent=2).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), StatusHandler)
+    threading.Thread(target=server.serve_forever, name='status-http', daemon=True).start()
+    logging.info(f"Serving status on http://{host}:{server.server_address[1]}/")
+    return server
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Convert new ACES/PIES drops as they land in Input/.")
+    arg_parser.add_argument('work_dir', nargs='?', default=PROJECT_DIR,
+                            help="Project folder holding Input/ and Output/")
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Parse worker processes per job")
+    arg_parser.add_argument('--poll', type=float, default=2.0, help="Seconds between scans of Input/")
+    arg_parser.add_argument('--settle', type=float, default=10.0,
+                            help="Seconds a feed must stay unchanged before it is picked up")
+    arg_parser.add_argument('--status-port', type=int, help="Serve queue depth and job latency as JSON on this port")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Reparse every feed on every job")
+    arg_parser.add_argument('--store', help="Apply drops as deltas to this catalog store (see convert_data.py --store)")
+    arg_parser.add_argument('--vcdb', help="VCdb snapshot folder for Year/Make/Model/Submodel labels")
+    arg_parser.add_argument('--sqlite', action='store_true', help="Also publish Consolidated_Catalog.db")
+    arg_parser.add_argument('--kits', choices=['union', 'intersection'], help="Roll component fitment up to kits")
+    arg_parser.add_argument('--text-index', action='store_true', help="Also publish Output/text_index")
+    arg_parser.add_argument('--once', action='store_true',
+                            help="Convert whatever is waiting (after settling) and exit")
+    args = arg_parser.parse_args(argv)
+
+    service = ConversionService(
+        args.work_dir, poll_interval=args.poll, settle=args.settle, workers=args.workers,
+        cache_dir=None if args.no_cache else os.path.join(args.work_dir, 'Processing', 'parse_cache'),
+        store=args.store, vcdb=args.vcdb, sqlite=args.sqlite, kits=args.kits,
+        text_index=TEXT_INDEX_DIR if args.text_index else None,
+    )
+    if service.catalog_is_current():
+        service.watcher.mark_current()
+    else:
+        logging.info("Output is older than Input; converting on startup")
+    service.write_status()
+
+    if args.status_port is not None:
+        serve_status(service, args.status_port)
+
+    if args.once:
+        # Wait for everything in Input to settle, then run whatever landed
+        service.poll()
+        while service.watcher.pending:
+            time.sleep(args.poll)
+            service.poll()
+        service.run_next(timeout=0)
+    else:
+        stop = threading.Event()
+        try:
+            service.serve(stop)
+        except KeyboardInterrupt:
+            logging.info("Stopping...")
+            stop.set()
+
+if __name__ == "__main__":
+    main()
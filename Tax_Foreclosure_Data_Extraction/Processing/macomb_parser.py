@@ -0,0 +1,183 @@
+"""Parallel parser for county tax-foreclosure text dumps (Macomb layout).
+
+The dump is a run of blocks, one per parcel:
+
+    Parcel ID#: 01-13-21-202-024
+    Amount to Redeem as of
+    12/01/2025: 22,832.28
+    Property Address: 26673
+    LAWRENCE CENTER LINE MI
+    The following parties may have an
+    interest in this property:
+    <one party per line>
+    OCCUPANT:
+    DESCRIPTION OF PROPERTY: ...
+    ______________________
+
+The file is memory-mapped and cut into byte ranges at "Parcel ID#:"
+markers, the ranges are parsed in a process pool and each worker spills
+its rows to a temp file. The spills are then streamed, in order, into the
+colon-delimited .txt and the .xlsx, so no more than one range of records
+is ever held in memory.
+
+    python macomb_parser.py ../Input/processed/macomb_tax ../Output/Macomb_County_Final
+
+With --pdf the dump is (re)extracted from the county PDF first, see pdf_ingest.py.
+"""
+import csv
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Folder with Input/ and Output/, replaced by upwork.py when configured
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MARKER = 'Parcel ID#:'
+BASE_COLUMNS = ['Tax ID', 'Amount', 'Address', 'City']
+
+AMOUNT_RE = re.compile(r'Amount to Redeem as of.*?\d{2}/\d{2}/\d{4}:\s*([\d,\.]+)', re.S)
+ADDRESS_RE = re.compile(r'Property Address:(.*?)The following parties', re.S)
+# Parties run to OCCUPANT:, or to the ____ record separator when a block has no OCCUPANT line
+PARTIES_RE = re.compile(r'interest in this property:(.*?)(?:OCCUPANT:|_{3,}|\Z)', re.S)
+
+def parse_block(block, county):
+    """Turn the text after one "Parcel ID#:" marker into [Tax ID, Amount, Address, City, parties...]."""
+    tax_id = block.strip().split('\n')[0].strip()
+
+    m = AMOUNT_RE.search(block)
+    amount = m.group(1) if m else ''
+
+    m = ADDRESS_RE.search(block)
+    address = ' '.join(m.group(1).split()) if m else ''
+
+    parties = []
+    m = PARTIES_RE.search(block)
+    if m:
+        parties = [line.strip() for line in m.group(1).split('\n') if line.strip()]
+
+    return [tax_id, amount, address, county] + parties
+
+def split_ranges(path, chunk_bytes):
+    """Byte ranges of roughly chunk_bytes, each starting at a "Parcel ID#:" line (or the file start)."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    marker = b'\n' + MARKER.encode()
+    starts = [0]
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        nominal = chunk_bytes
+        while nominal < size:
+            pos = mm.find(marker, nominal)
+            if pos < 0:
+                break
+            starts.append(pos + 1)
+            nominal = pos + 1 + chunk_bytes
+    return list(zip(starts, starts[1:] + [size]))
+
+def parse_range(task):
+    """Parse one byte range into a spill file; returns (records, most parties on a record).
+
+    Module-level so it can run in a worker process.
+    """
+    path, start, end, county, spill_path = task
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Ranges start on an ASCII marker, so they never split a UTF-8 sequence
+        text = mm[start:end].decode('utf-8')
+
+    # A range starts with a marker, and the file's first range with whatever
+    # heading precedes the first parcel; neither is a block
+    blocks = text.split(MARKER)[1:]
+
+    records = 0
+    max_parties = 0
+    with open(spill_path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh, delimiter=':')
+        for block in blocks:
+            row = parse_block(block, county)
+            writer.writerow(row)
+            records += 1
+            max_parties = max(max_parties, len(row) - len(BASE_COLUMNS))
+    return records, max_parties
+
+def convert(input_path, txt_path, xlsx_path=None, county='Macomb County', workers=None,
+            chunk_bytes=4 * 1024 * 1024):
+    """Parse a dump into the colon-delimited txt (and xlsx) deliverables; returns the record count.
+
+    Interested parties are spread over "Interested Party 1..N" columns, N
+    being the most parties on any record.
+    """
+    ranges = split_ranges(input_path, chunk_bytes)
+    logging.info(f"Parsing {input_path} in {len(ranges)} ranges...")
+
+    spill_dir = tempfile.mkdtemp(prefix='tax_parse_', dir=os.path.dirname(os.path.abspath(txt_path)))
+    try:
+        tasks = [(input_path, start, end, county, os.path.join(spill_dir, f"{i:05d}.txt"))
+                 for i, (start, end) in enumerate(ranges)]
+        if workers == 1 or len(tasks) <= 1:
+            results = [parse_range(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(parse_range, tasks))
+
+        records = sum(n for n, _ in results)
+        max_parties = max((p for _, p in results), default=0)
+        header = BASE_COLUMNS + [f"Interested Party {i}" for i in range(1, max_parties + 1)]
+        width = len(header)
+
+        ws = wb = None
+        if xlsx_path:
+            from openpyxl import Workbook
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet('Sheet1')
+            ws.append(header)
+
+        with open(txt_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out, delimiter=':', lineterminator='\r\n')
+            writer.writerow(header)
+            for task in tasks:
+                with open(task[-1], newline='', encoding='utf-8') as fh:
+                    for row in csv.reader(fh, delimiter=':'):
+                        row += [''] * (width - len(row))
+                        writer.writerow(row)
+                        if ws is not None:
+                            ws.append([cell or None for cell in row])
+
+        logging.info(f"Saved {records} records to {txt_path}")
+        if wb is not None:
+            wb.save(xlsx_path)
+            logging.info(f"Saved Excel to {xlsx_path}")
+        return records
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+def main(argv=None):
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Parse a tax-foreclosure text dump into .txt/.xlsx.")
+    arg_parser.add_argument('input', nargs='?', default=os.path.join(PROJECT_DIR, "Input", "processed", "macomb_tax"))
+    arg_parser.add_argument('output', nargs='?', default=os.path.join(PROJECT_DIR, "Output", "Macomb_County_Final"),
+                            help="Output path without extension; .txt and .xlsx are written")
+    arg_parser.add_argument('--county', default='Macomb County', help="Value of the City column")
+    arg_parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    arg_parser.add_argument('--chunk-mb', type=float, default=4, help="Approximate size of each parsed range")
+    arg_parser.add_argument('--no-xlsx', action='store_true', help="Only write the .txt")
+    arg_parser.add_argument('--pdf', help="Extract the dump from this PDF into `input` before parsing")
+    args = arg_parser.parse_args(argv)
+
+    if args.pdf:
+        from pdf_ingest import pdf_to_text
+
+        pdf_to_text(args.pdf, args.input, workers=args.workers)
+
+    convert(args.input, args.output + '.txt', None if args.no_xlsx else args.output + '.xlsx',
+            county=args.county, workers=args.workers, chunk_bytes=int(args.chunk_mb * 1024 * 1024))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Page-parallel text extraction for the county foreclosure PDFs.
+
+The listing pages are laid out in newspaper columns under a running head
+("December 2025 MacombDaily.com Page 3") and a line of column heads
+("CITY OF CENTER LINE ..."):
+
+    | running head                                     |
+    | column heads                                     |
+    | col 1 | col 2 | col 3 | col 4 | col 5 | col 6    |
+
+Each page is cropped below the heads and read column by column, so the
+text comes out in reading order and the heads never end up inside a
+record. A record that runs off the last column of a page carries on in
+the first column of the next one; pages are joined with a plain newline,
+which makes it one contiguous block again. Everything before the first
+"Parcel ID#:" (the legal notice) is dropped.
+
+Pages are extracted in a process pool and their text is cached per page
+under the PDF's SHA-256, so converting the same PDF again doesn't open it
+at all. Page text is streamed in page order into the dump that
+macomb_parser.py parses:
+
+    python pdf_ingest.py "../Input/2026 Macomb Tax foreclosure.pdf" ../Input/processed/macomb_tax
+"""
+import hashlib
+import json
+import logging
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Bump when the page text changes, so cached pages of an older extractor aren't reused
+EXTRACT_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_cache')
+
+RECORD_MARKER = 'Parcel ID#:'
+# Words that start a line at the left edge of a listing column
+COLUMN_WORDS = ('Parcel', 'Amount', 'Property', 'OCCUPANT:', 'DESCRIPTION')
+# Words closer than this (pt) to a column start belong to the same column
+COLUMN_SLACK = 20
+# Fewest keyword lines for an x position to count as a column start
+MIN_COLUMN_HITS = 5
+# Lines whose tops differ by less than this (pt) are the same line
+LINE_SLACK = 3
+
+def pdf_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def column_edges(page, words):
+    """x positions cutting a listing page into its columns, or None for a page that isn't one.
+
+    Column starts are found from the record keywords at the start of lines;
+    columns without them (e.g. a short last column) are filled in at the
+    same pitch.
+    """
+    # [first x, hits] per cluster of keyword positions
+    clusters = []
+    for x in sorted(w['x0'] for w in words if w['text'] in COLUMN_WORDS and 0 <= w['x0'] < page.width):
+        if clusters and x - clusters[-1][0] <= COLUMN_SLACK:
+            clusters[-1][1] += 1
+        else:
+            clusters.append([x, 1])
+    # A real column starts dozens of lines; a stray keyword inside a line doesn't count
+    most = max((hits for _, hits in clusters), default=0)
+    starts = [x for x, hits in clusters if hits >= max(MIN_COLUMN_HITS, most / 4)]
+    if len(starts) < 2:
+        return None
+
+    # Columns sit on a regular grid; snap it to the starts that were found
+    pitch = statistics.median(b - a for a, b in zip(starts, starts[1:]))
+    columns = []
+    x = starts[0]
+    while x - pitch > -COLUMN_SLACK:
+        x -= pitch
+    while x < page.width - COLUMN_SLACK:
+        x = next((s for s in starts if abs(s - x) <= COLUMN_SLACK), x)
+        columns.append(x)
+        x += pitch
+    # Cut just left of each column start; the outer edges are the page's
+    return [0] + [x - 1 for x in columns[1:]] + [page.width]
+
+def page_text(page):
+    """Body text of one page, column after column ('' for a page without the listing layout)."""
+    words = page.extract_words()
+    edges = column_edges(page, words)
+    if edges is None:
+        return ''
+
+    # The running head and the column heads are the first two lines
+    tops = sorted({round(w['top']) for w in words})
+    lines = []
+    for top in tops:
+        if not lines or top - lines[-1] > LINE_SLACK:
+            lines.append(top)
+    if len(lines) < 3:
+        return ''
+    heads_bottom = max(w['bottom'] for w in words if w['top'] < lines[2] - LINE_SLACK)
+    body_top = (heads_bottom + lines[2]) / 2
+
+    columns = []
+    for x0, x1 in zip(edges, edges[1:]):
+        # A character belongs to the column holding its middle; crop() alone
+        # would also keep the edge of the next column and, on spread pages,
+        # the facing page's text just past the page edge
+        column = page.crop((x0, body_top, x1, page.height)).filter(
+            lambda obj, x0=x0, x1=x1: x0 <= (obj['x0'] + obj['x1']) / 2 < x1)
+        # Keep the spaces at line ends, as in the dumps made before this extractor
+        text = column.extract_text(keep_blank_chars=True)
+        if text.strip():
+            columns.append(text)
+    return '\n'.join(columns)
+
+def _page_path(cache_dir, page_number):
+    return os.path.join(cache_dir, f"{page_number:05d}.txt")
+
+def extract_pages(task):
+    """Extract a run of pages into the page cache; returns the page numbers written.
+
+    Module-level so it can run in a worker process. Each page is written to a
+    temp file and renamed, so an interrupted run never leaves half a page behind.
+    """
+    pdf_path, page_numbers, cache_dir = task
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            page = pdf.pages[page_number - 1]
+            text = page_text(page)
+            page.close()
+            path = _page_path(cache_dir, page_number)
+            with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+                fh.write(text)
+            os.replace(path + '.tmp', path)
+    return page_numbers
+
+class PageCache:
+    """Per-page text of one PDF, under <cache_dir>/<sha256>-v<EXTRACT_VERSION>/."""
+
+    def __init__(self, pdf_path, cache_dir=DEFAULT_CACHE_DIR):
+        self.pdf_path = pdf_path
+        self.dir = os.path.join(cache_dir, f"{pdf_digest(pdf_path)}-v{EXTRACT_VERSION}")
+        os.makedirs(self.dir, exist_ok=True)
+
+    def page_count(self):
+        meta_path = os.path.join(self.dir, 'pages.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as fh:
+                return json.load(fh)['pages']
+
+        import pdfplumber
+
+        with pdfplumber.open(self.pdf_path) as pdf:
+            count = len(pdf.pages)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as fh:
+            json.dump({'pdf': os.path.basename(self.pdf_path), 'pages': count}, fh)
+        os.replace(meta_path + '.tmp', meta_path)
+        return count
+
+    def missing(self, count):
+        return [n for n in range(1, count + 1) if not os.path.exists(_page_path(self.dir, n))]
+
+    def read(self, page_number):
+        with open(_page_path(self.dir, page_number), encoding='utf-8') as fh:
+            return fh.read()
+
+def iter_pages(pdf_path, cache_dir=DEFAULT_CACHE_DIR, workers=None, batch_pages=4):
+    """Yield (page number, text) in page order, extracting uncached pages in a process pool.
+
+    A page is yielded as soon as it and every page before it are done, so
+    the caller can start on page 1 while later pages are still extracting.
+    """
+    cache = PageCache(pdf_path, cache_dir)
+    count = cache.page_count()
+    missing = cache.missing(count)
+    logging.info(f"{os.path.basename(pdf_path)}: {count} pages, {count - len(missing)} cached")
+
+    if not missing:
+        for page_number in range(1, count + 1):
+            yield page_number, cache.read(page_number)
+        return
+
+    batches = [missing[i:i + batch_pages] for i in range(0, len(missing), batch_pages)]
+    tasks = [(pdf_path, batch, cache.dir) for batch in batches]
+    if workers == 1 or len(tasks) == 1:
+        pending = iter(map(extract_pages, tasks))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        # map() hands results back in submission order, i.e. page order
+        pending = pool.map(extract_pages, tasks)
+    try:
+        missing = set(missing)
+        done = set()
+        for page_number in range(1, count + 1):
+            while page_number in missing and page_number not in done:
+                done.update(next(pending))
+            yield page_number, cache.read(page_number)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def iter_listing(pages):
+    """Page texts from the first "Parcel ID#:" on; the pages before it are the legal notice."""
+    started = False
+    for page_number, text in pages:
+        if not started:
+            pos = text.find(RECORD_MARKER)
+            if pos < 0:
+                continue
+            text = text[pos:]
+            started = True
+        yield text
+
+def pdf_to_text(pdf_path, txt_path, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """Write the listing text of a PDF to txt_path, page by page as pages come in; returns pages written."""
+    os.makedirs(os.path.dirname(os.path.abspath(txt_path)), exist_ok=True)
+    tmp_path = txt_path + '.tmp'
+    pages = 0
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for text in iter_listing(iter_pages(pdf_path, cache_dir, workers)):
+            # Joining on a newline stitches a record cut by the page break back together
+            out.write(text.rstrip('\n') + '\n')
+            pages += 1
+    os.replace(tmp_path, txt_path)
+    logging.info(f"Wrote {pages} listing pages to {txt_path}")
+    return pages
+
+def main(argv=None):
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Extract the listing text of a foreclosure PDF.")
+    arg_parser.add_argument('pdf')
+    arg_parser.add_argument('output', help="Text dump to write, e.g. ../Input/processed/macomb_tax")
+    arg_parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    arg_parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Per-page text cache")
+    args = arg_parser.parse_args(argv)
+
+    pdf_to_text(args.pdf, args.output, args.cache_dir, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Cold-start time of the upwork.py commands that don't process anything.
+
+Every case runs in a fresh interpreter, the way cron starts it:
+
+    python bench_startup.py
+    python bench_startup.py --repeat 20 --limit 0.5
+
+For each case the first run (the coldest) and the median of --repeat runs
+are reported, along with any heavy library (pandas, numpy, requests, bs4,
+...) the command imported, from `python -X importtime`. For comparison,
+the cost of importing those libraries on their own is shown at the end.
+Exits with status 1 when a median reaches --limit seconds or a case
+imports a heavy library.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+UPWORK = os.path.join(HERE, 'upwork.py')
+
+# Libraries the no-op commands must not load
+HEAVY = ('pandas', 'numpy', 'requests', 'bs4', 'lxml', 'openpyxl', 'pdfplumber', 'pyarrow')
+
+def cases():
+    import upwork
+
+    yield ['--help']
+    yield ['paths']
+    for name in upwork.COMMANDS:
+        yield [name, '--help']
+
+def run(args):
+    """Wall time of one fresh `python upwork.py args` run."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, UPWORK, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   check=True)
+    return time.perf_counter() - start
+
+def heavy_imports(command):
+    """Heavy libraries imported by `python <command>`, from -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    found = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:'):
+            name = line.rsplit('|', 1)[-1].strip().split('.')[0]
+            if name in HEAVY:
+                found.add(name)
+    return sorted(found)
+
+def import_time(modules, repeat):
+    """Median wall time of a fresh interpreter importing modules."""
+    command = [sys.executable, '-c', f"import {', '.join(modules)}"]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode:
+            return None
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark cold start of the upwork.py no-op commands.")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Runs per case; the median is reported")
+    arg_parser.add_argument('--limit', type=float, default=1.0, help="Slowest acceptable median, in seconds")
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    print(f"{'upwork.py':<28}{'first s':>9}{'median s':>10}  heavy imports")
+    for case in cases():
+        times = [run(case) for _ in range(args.repeat)]
+        median = statistics.median(times)
+        heavy = heavy_imports([UPWORK, *case])
+        print(f"{' '.join(case):<28}{times[0]:>9.3f}{median:>10.3f}  {', '.join(heavy) or '-'}")
+        failed = failed or median >= args.limit or bool(heavy)
+
+    print(f"\n{'import on its own':<28}{'':>9}{'median s':>10}")
+    for modules in (['sys'], ['pandas'], ['requests', 'bs4'], ['openpyxl'], ['pdfplumber']):
+        elapsed = import_time(modules, args.repeat)
+        shown = f"{elapsed:>10.3f}" if elapsed is not None else f"{'n/a':>10}"
+        print(f"{', '.join(modules):<28}{'':>9}{shown}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""One command line for all the pipelines in this repository.
+
+    python upwork.py convert [work_dir] [--workers 4] ...    ACES/PIES -> consolidated catalog
+    python upwork.py watch [work_dir] [--once] ...           convert drops as they land in Input/
+    python upwork.py verify [work_dir] [--sample 50] ...     check the catalog against the feeds
+    python upwork.py scrape [--offline] ...                  Dublin parish directory -> CSV
+    python upwork.py creditors [input] [output]              Form 206 E/F dump -> creditor CSV
+    python upwork.py foreclosure [input] [output] [--pdf X]  tax-foreclosure dump -> .txt/.xlsx
+    python upwork.py pdf <pdf> <output>                      foreclosure PDF -> text dump
+    python upwork.py paths                                   show the project folders in use
+
+Everything after the command goes to that pipeline's own main(), so its
+options are the script's (`python upwork.py convert --help`). Only the
+script of the chosen command is imported, and the scripts import pandas,
+numpy, requests, bs4 and the like where they are used, so `--help`,
+`paths` or an offline scrape start without them (see bench_startup.py).
+
+The project folders default to the ones next to this file. To run on data
+elsewhere, list them in upwork.ini next to this file, or in the file given
+with --config or $UPWORK_CONFIG; relative paths are taken from the config
+file's folder:
+
+    [projects]
+    aces = D:/Data/04_Aces_Pies_Data
+    parish = D:/Data/03_Dublin_Parish_Data
+
+Paths passed to a command still win over the configured folder.
+"""
+import argparse
+import configparser
+import importlib
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG_NAME = 'upwork.ini'
+CONFIG_ENV = 'UPWORK_CONFIG'
+
+# Config key -> folder of the project in this repository
+PROJECTS = {
+    'creditors': '02_Creditor_Data_Project',
+    'parish': '03_Dublin_Parish_Data',
+    'aces': '04_Aces_Pies_Data',
+    'foreclosure': 'Tax_Foreclosure_Data_Extraction',
+}
+
+# Command -> (project, script folder in the project, module, entry point taking argv, help)
+COMMANDS = {
+    'convert': ('aces', 'Processing', 'convert_data', 'main', "Convert ACES/PIES feeds into the consolidated catalog"),
+    'watch': ('aces', 'Processing', 'watch_input', 'main', "Convert new ACES/PIES drops as they land in Input/"),
+    'verify': ('aces', 'Processing', 'verify_conversion', 'main', "Validate the consolidated catalog against the feeds"),
+    'scrape': ('parish', 'Input', 'script', 'cli', "Scrape the Dublin Diocese parish directory"),
+    'creditors': ('creditors', 'Processing', 'extract_data', 'main', "Extract creditors from a Form 206 E/F dump"),
+    'foreclosure': ('foreclosure', 'Processing', 'macomb_parser', 'main', "Parse a tax-foreclosure text dump"),
+    'pdf': ('foreclosure', 'Processing', 'pdf_ingest', 'main', "Extract the listing text of a foreclosure PDF"),
+}
+
+def load_config(path=None):
+    """{project: folder} from the config file, over the folders in this repository.
+
+    path falls back to $UPWORK_CONFIG, then to upwork.ini next to this file;
+    only an explicitly given file has to exist.
+    """
+    folders = {project: os.path.join(HERE, folder) for project, folder in PROJECTS.items()}
+    path = path or os.environ.get(CONFIG_ENV)
+    if path is None:
+        path = os.path.join(HERE, CONFIG_NAME)
+        if not os.path.exists(path):
+            return folders
+    elif not os.path.exists(path):
+        raise FileNotFoundError(f"Config file {path} not found")
+
+    config = configparser.ConfigParser()
+    config.read(path, encoding='utf-8')
+    if config.has_section('projects'):
+        base = os.path.dirname(os.path.abspath(path))
+        for project, folder in config.items('projects'):
+            if project not in PROJECTS:
+                raise ValueError(f"{path}: unknown project {project!r}, expected one of {', '.join(PROJECTS)}")
+            folders[project] = os.path.join(base, os.path.expanduser(folder))
+    return folders
+
+def run_command(name, argv, folders):
+    """Import the command's script, point it at its project folder and run its main(argv)."""
+    project, script_dir, module_name, entry, _ = COMMANDS[name]
+    # The scripts import their siblings by plain name
+    sys.path.insert(0, os.path.join(HERE, PROJECTS[project], script_dir))
+    module = importlib.import_module(module_name)
+    if hasattr(module, 'PROJECT_DIR'):
+        module.PROJECT_DIR = folders[project]
+    # Usage lines then read "upwork convert ..." rather than "upwork.py ..."
+    sys.argv = [f"upwork {name}", *argv]
+    return getattr(module, entry)(argv)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog='upwork', description="Run one of the data pipelines in this repository.",
+        epilog="Run `upwork.py <command> --help` for the options of a command.")
+    arg_parser.add_argument('--config', help=f"Project folders config (default: ${CONFIG_ENV} or {CONFIG_NAME})")
+    commands = arg_parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (*_, help_text) in COMMANDS.items():
+        # The script parses its own options, --help included
+        commands.add_parser(name, help=help_text, add_help=False)
+    commands.add_parser('paths', help="Show the project folders in use")
+    args, rest = arg_parser.parse_known_args(argv)
+
+    try:
+        folders = load_config(args.config)
+    except (OSError, ValueError, configparser.Error) as e:
+        arg_parser.error(str(e))
+
+    if args.command == 'paths':
+        if rest:
+            arg_parser.error(f"unrecognized arguments: {' '.join(rest)}")
+        for project, folder in folders.items():
+            state = '' if os.path.isdir(folder) else '  (missing)'
+            print(f"{project:<12} {os.path.normpath(folder)}{state}")
+        return 0
+    return run_command(args.command, rest, folders)
+
+if __name__ == "__main__":
+    sys.exit(main())